@@ -0,0 +1,123 @@
+"""
+Amadeus OAuth Token Manager - caches the bearer token and refreshes it ahead of expiry
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+from provider_client import get_provider_client
+from tracing import current_span, span
+
+# Override to point at another environment or at fake_providers.py
+AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL", "https://test.api.amadeus.com").rstrip("/")
+AMADEUS_TOKEN_URL = f"{AMADEUS_BASE_URL}/v1/security/oauth2/token"
+
+
+class AmadeusTokenManager:
+    """Thread-safe cache for the Amadeus client-credentials access token.
+
+    The token is reused until ``expires_in`` runs out. Once it is within
+    ``refresh_margin`` seconds of expiry, callers keep getting the cached token
+    while a single background thread fetches a new one. Only one refresh runs
+    at a time, whether it was triggered in the background or by a caller that
+    found no usable token.
+    """
+
+    def __init__(self, client_id, client_secret, token_url=AMADEUS_TOKEN_URL,
+                 refresh_margin=60.0, background_refresh=True):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0,
+                       "background_refreshes": 0, "failures": 0}
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _request_token(self):
+        """Fetch a new token from the OAuth endpoint and return (token, expires_in)."""
+        payload = {
+            'grant_type': 'client_credentials',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }
+        with span("amadeus.token.fetch"):
+            response = get_provider_client().post(self.token_url, data=payload)
+        if response.status_code != 200:
+            raise Exception(f"Failed to retrieve Amadeus token: {response.text}")
+        body = response.json()
+        return body["access_token"], float(body.get("expires_in", 0))
+
+    def _refresh(self):
+        """Replace the cached token. Caller must hold ``_refresh_lock``."""
+        try:
+            token, expires_in = self._request_token()
+        except Exception:
+            self._count("failures")
+            raise
+        # Publish expiry before the token so readers never pair a new token with a stale deadline
+        self._expires_at = time.monotonic() + expires_in
+        self._token = token
+        self._count("refreshes")
+        return token
+
+    def _background_refresh(self):
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh()
+            self._count("background_refreshes")
+        except Exception:
+            # The current token is still valid; the next caller retries
+            pass
+        finally:
+            self._refresh_lock.release()
+
+    def get_token(self):
+        """Return a valid access token, fetching or refreshing it as needed."""
+        token, remaining = self._token, self._expires_at - time.monotonic()
+
+        if token and remaining > 0:
+            self._count("hits")
+            current_span().set("amadeus.token_cached", True)
+            if remaining <= self.refresh_margin and self.background_refresh \
+                    and not self._refresh_lock.locked():
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+            return token
+
+        self._count("misses")
+        current_span().set("amadeus.token_cached", False)
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token and self._expires_at - time.monotonic() > 0:
+                return self._token
+            return self._refresh()
+
+    async def aget_token(self):
+        """Async version of :meth:`get_token`; cache hits never leave the event loop."""
+        token, remaining = self._token, self._expires_at - time.monotonic()
+        if token and remaining > self.refresh_margin:
+            self._count("hits")
+            current_span().set("amadeus.token_cached", True)
+            return token
+        return await asyncio.to_thread(self.get_token)
+
+    def invalidate(self):
+        """Drop the cached token, e.g. after the API rejects it with a 401."""
+        self._token = None
+        self._expires_at = 0.0
+
+    def stats(self):
+        """Return a snapshot of the hit/refresh counters."""
+        with self._stats_lock:
+            return dict(self._stats)
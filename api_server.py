@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Travel Light API Server - headless HTTP/ASGI interface to the travel graph
+
+Endpoints:
+    POST   /chat                  {"message": str, "thread_id"?: str} -> {"thread_id", "reply"}
+    POST   /chat/stream           same body, Server-Sent Events (agent/token/final)
+    POST   /sessions              -> {"thread_id"}
+    GET    /sessions/{thread_id}  -> {"thread_id", "messages"}
+    DELETE /sessions/{thread_id}
+    GET    /healthz
+    GET    /metrics               Prometheus text format (see metrics.py)
+
+Graph turns run in a bounded worker pool. Requests beyond the pool wait in a
+bounded queue; when the queue is full (or a request waits too long) the server
+answers 503 with Retry-After so a load balancer can try another instance.
+
+Run with: python api_server.py   (or: uvicorn api_server:app)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+import metrics
+from llm_scheduler import get_scheduler
+from tracing import span
+
+# Load environment variables
+load_dotenv()
+
+MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "8"))
+MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "64"))
+QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "30"))
+SHUTDOWN_TIMEOUT = float(os.getenv("API_SHUTDOWN_TIMEOUT", "30"))
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot get a worker slot."""
+
+
+class ConcurrencyLimiter:
+    """At most ``max_concurrency`` requests run at once and at most ``max_queue`` wait."""
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, max_queue=MAX_QUEUE, queue_timeout=QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = None
+        self._idle = None
+
+    def _ensure_loop_state(self):
+        # asyncio primitives are created lazily inside the server's event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._idle = asyncio.Event()
+            self._idle.set()
+
+    async def acquire(self):
+        self._ensure_loop_state()
+        if self.in_flight + self.waiting >= self.max_concurrency + self.max_queue:
+            raise Overloaded("request queue is full")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise Overloaded("timed out waiting for a worker")
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self._idle.clear()
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drain(self, timeout):
+        """Wait until no request is in flight, or ``timeout`` seconds pass."""
+        self._ensure_loop_state()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _transcript(state_values):
+    from conversation_stream import transcript
+    return transcript(state_values.get("messages", []))
+
+
+def _reply(state):
+    messages = state.get("messages", [])
+    if not messages:
+        return ""
+    last = messages[-1]
+    return last.get("content", "") if isinstance(last, dict) else getattr(last, "content", str(last))
+
+
+class TravelAPI:
+    """Minimal ASGI application serving the compiled travel graph."""
+
+    def __init__(self, graph_factory=None, limiter=None, shutdown_timeout=SHUTDOWN_TIMEOUT):
+        self.graph_factory = graph_factory
+        self.limiter = limiter or ConcurrencyLimiter()
+        self.shutdown_timeout = shutdown_timeout
+        self.executor = ThreadPoolExecutor(max_workers=self.limiter.max_concurrency,
+                                           thread_name_prefix="travel-graph")
+        self.draining = False
+        self._graph = None
+        self._graph_lock = threading.Lock()
+
+    @property
+    def graph(self):
+        if self._graph is None:
+            with self._graph_lock:
+                if self._graph is None:
+                    factory = self.graph_factory
+                    if factory is None:
+                        from checkpointing import session_checkpointer_kind
+                        from travel_graph import get_conversation_graph
+
+                        # Clients send one message per turn, so history must live in a checkpointer
+                        def factory():
+                            return get_conversation_graph(session_checkpointer_kind())
+                    self._graph = factory()
+        return self._graph
+
+    # --- ASGI plumbing -------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Build the graph before taking traffic so the first request is warm
+                try:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, lambda: self.graph)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                # Stop accepting work, let in-flight turns finish, then stop the pool
+                self.draining = True
+                await self.limiter.drain(self.shutdown_timeout)
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_json(receive):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        return json.loads(body or b"{}")
+
+    @staticmethod
+    async def _send_json(send, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), *headers],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_metrics(send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", metrics.CONTENT_TYPE.encode())],
+        })
+        await send({"type": "http.response.body", "body": metrics.render().encode()})
+
+    async def _http(self, scope, receive, send):
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        try:
+            if path == "/healthz" and method == "GET":
+                status = 503 if self.draining else 200
+                return await self._send_json(send, status, {
+                    "status": "draining" if self.draining else "ok",
+                    "in_flight": self.limiter.in_flight,
+                    "queued": self.limiter.waiting,
+                    "llm": get_scheduler().stats(),
+                })
+            if path == "/metrics" and method == "GET":
+                return await self._send_metrics(send)
+            if self.draining:
+                return await self._send_json(send, 503, {"error": "server is shutting down"},
+                                             [(b"retry-after", b"1")])
+            if path == "/chat" and method == "POST":
+                return await self._chat(receive, send)
+            if path == "/chat/stream" and method == "POST":
+                return await self._chat_stream(receive, send)
+            if path == "/sessions" and method == "POST":
+                return await self._send_json(send, 201, {"thread_id": uuid.uuid4().hex})
+            if path.startswith("/sessions/") and method in ("GET", "DELETE"):
+                return await self._session(method, path.split("/", 2)[2], send)
+            return await self._send_json(send, 404, {"error": "not found"})
+        except Overloaded as e:
+            return await self._send_json(send, 503, {"error": str(e)}, [(b"retry-after", b"2")])
+        except (ValueError, KeyError) as e:
+            return await self._send_json(send, 400, {"error": f"bad request: {e}"})
+        except Exception as e:
+            return await self._send_json(send, 500, {"error": str(e)})
+
+    # --- Handlers ----------------------------------------------------------
+
+    def _turn_input(self, body):
+        if not isinstance(body, dict):
+            raise ValueError("request body must be a JSON object")
+        message = body["message"]
+        if not isinstance(message, str) or not message.strip():
+            raise ValueError("'message' must be a non-empty string")
+        thread_id = body.get("thread_id") or uuid.uuid4().hex
+        from checkpointing import thread_config
+        return thread_id, {"messages": [{"role": "user", "content": message.strip()}]}, thread_config(thread_id)
+
+    def _invoke(self, thread_id, state, config):
+        # Runs in a worker thread, so the turn span is opened here rather than on the event loop
+        with span("turn", thread_id=thread_id, endpoint="/chat"), metrics.track_turn("api"):
+            return self.graph.invoke(state, config)
+
+    async def _chat(self, receive, send):
+        thread_id, state, config = self._turn_input(await self._read_json(receive))
+        await self.limiter.acquire()
+        try:
+            started = time.perf_counter()
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._invoke, thread_id, state, config)
+            elapsed = time.perf_counter() - started
+        finally:
+            self.limiter.release()
+        await self._send_json(send, 200, {"thread_id": thread_id, "reply": _reply(result),
+                                          "elapsed_seconds": round(elapsed, 3)})
+
+    async def _chat_stream(self, receive, send):
+        from conversation_stream import stream_conversation
+
+        thread_id, state, config = self._turn_input(await self._read_json(receive))
+        await self.limiter.acquire()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def produce():
+            try:
+                with span("turn", thread_id=thread_id, endpoint="/chat/stream"), \
+                        metrics.track_turn("api_stream"):
+                    for event in stream_conversation(self.graph, state, config):
+                        if event["type"] == "final":
+                            event = {"type": "final", "reply": _reply(event["state"])}
+                        loop.call_soon_threadsafe(queue.put_nowait, event)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, {"type": "error", "error": str(e)})
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        try:
+            worker = loop.run_in_executor(self.executor, produce)
+        except Exception:
+            self.limiter.release()
+            raise
+        # The slot is freed when the graph turn ends, not when this handler does: after a client
+        # disconnects mid-stream the worker keeps running and must still count as in flight
+        worker.add_done_callback(lambda _: self.limiter.release())
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"),
+                        (b"x-thread-id", thread_id.encode())],
+        })
+        while True:
+            event = await queue.get()
+            if event is done:
+                break
+            data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+            await send({"type": "http.response.body", "body": data, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        await worker
+
+    async def _session(self, method, thread_id, send):
+        from checkpointing import thread_config
+
+        loop = asyncio.get_running_loop()
+        if method == "GET":
+            snapshot = await loop.run_in_executor(
+                self.executor, lambda: self.graph.get_state(thread_config(thread_id)))
+            return await self._send_json(send, 200, {"thread_id": thread_id,
+                                                     "messages": _transcript(snapshot.values)})
+
+        delete_thread = getattr(getattr(self.graph, "checkpointer", None), "delete_thread", None)
+        if delete_thread is None:
+            return await self._send_json(send, 501, {"error": "checkpointer cannot delete threads"})
+        await loop.run_in_executor(self.executor, delete_thread, thread_id)
+        return await self._send_json(send, 200, {"thread_id": thread_id, "deleted": True})
+
+
+app = TravelAPI()
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "api_server:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        workers=int(os.getenv("API_WORKERS", "1")),
+        timeout_graceful_shutdown=int(SHUTDOWN_TIMEOUT),
+    )
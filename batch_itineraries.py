@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Batch Itinerary Generator - precompute itineraries for many (destination, days, budget) jobs
+
+Jobs come from a JSONL file ({"destination": "Bali", "days": 3, "budget": "budget"} per
+line), a CSV file with destination,days,budget columns, or --destinations expanded
+over --days and --budgets. Results are appended to the output JSONL as each job
+finishes; that file doubles as the checkpoint, so rerunning skips jobs that already
+succeeded. A failed job is recorded with status "error" and retried on the next run.
+
+Usage:
+    python batch_itineraries.py jobs.jsonl -o itineraries.jsonl --concurrency 8
+    python batch_itineraries.py --destinations top500.txt --days 1-7 --budgets budget,mid-range,luxury
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from llm_provider import llm_configured
+from llm_scheduler import llm_priority
+
+# Load environment variables
+load_dotenv()
+
+BUDGETS = ("budget", "mid-range", "luxury")
+
+
+def job_key(job) -> str:
+    return f"{job['destination'].strip().lower()}|{int(job['days'])}|{job['budget'].strip().lower()}"
+
+
+def load_jobs(path):
+    """Read jobs from a .jsonl or .csv file."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    return [{"destination": r["destination"], "days": int(r["days"]), "budget": r["budget"]} for r in rows]
+
+
+def expand_jobs(destinations_path, days_spec, budgets):
+    """Cross product of destinations (one per line) x days range x budget tiers."""
+    first, _, last = days_spec.partition("-")
+    days = range(int(first), int(last or first) + 1)
+    with open(destinations_path, encoding="utf-8") as f:
+        destinations = [line.strip() for line in f if line.strip()]
+    return [{"destination": d, "days": n, "budget": b} for d in destinations for n in days for b in budgets]
+
+
+def completed_jobs(output_path):
+    """Keys of jobs that already succeeded in a previous run."""
+    done = set()
+    if os.path.exists(output_path):
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a partially written last line from an interrupted run
+                if record.get("status") == "ok":
+                    done.add(record["key"])
+    return done
+
+
+async def run_batch(agent, jobs, output_path, concurrency=8, retries=2):
+    """Run ``jobs`` against ``agent`` with at most ``concurrency`` in flight.
+
+    Returns a summary dict with ok/error/skipped counts.
+    """
+    done = completed_jobs(output_path)
+    pending = [job for job in jobs if job_key(job) not in done]
+    summary = {"total": len(jobs), "skipped": len(jobs) - len(pending), "ok": 0, "error": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    write_lock = asyncio.Lock()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def run_job(job):
+            prompt = f"Plan a {job['days']}-day {job['budget']} trip to {job['destination']}"
+            record = {"key": job_key(job), **job}
+            started = time.perf_counter()
+            async with semaphore:
+                for attempt in range(retries + 1):
+                    try:
+                        result = await agent.ainvoke({"messages": [{"role": "user", "content": prompt}]})
+                        record.update(status="ok", itinerary=result["messages"][-1].content, attempts=attempt + 1)
+                        record.pop("error", None)  # left over from an earlier failed attempt
+                        break
+                    except Exception as e:
+                        record.update(status="error", error=str(e), attempts=attempt + 1)
+                        if attempt < retries:
+                            await asyncio.sleep(min(2 ** attempt, 30))
+            record["seconds"] = round(time.perf_counter() - started, 3)
+            async with write_lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+            summary[record["status"]] += 1
+            print(f"{'✅' if record['status'] == 'ok' else '❌'} {record['key']} ({record['seconds']}s)", flush=True)
+
+        # Batch calls yield to interactive traffic sharing the same LLM quota
+        with llm_priority("batch"):
+            await asyncio.gather(*(run_job(job) for job in pending))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute itineraries in bulk")
+    parser.add_argument("jobs", nargs="?", help="jobs file (.jsonl or .csv)")
+    parser.add_argument("-o", "--output", default="itineraries.jsonl", help="output JSONL (also the resume checkpoint)")
+    parser.add_argument("--destinations", help="file with one destination per line, expanded over --days/--budgets")
+    parser.add_argument("--days", default="1-7", help="day range for --destinations, e.g. 1-7")
+    parser.add_argument("--budgets", default=",".join(BUDGETS), help="comma-separated budget tiers")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("BATCH_CONCURRENCY", "8")))
+    parser.add_argument("--retries", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.destinations:
+        jobs = expand_jobs(args.destinations, args.days, [b.strip() for b in args.budgets.split(",")])
+    elif args.jobs:
+        jobs = load_jobs(args.jobs)
+    else:
+        parser.error("provide a jobs file or --destinations")
+
+    if not llm_configured():
+        print("❌ Error: OPENAI_API_KEY not found in environment variables.")
+        return 1
+
+    from travel_light import build_itinerary_agent
+
+    print(f"🚀 Generating {len(jobs)} itineraries with concurrency {args.concurrency}")
+    summary = asyncio.run(run_batch(build_itinerary_agent(), jobs, args.output, args.concurrency, args.retries))
+    print(f"\n📋 Done: {summary['ok']} ok, {summary['error']} failed, {summary['skipped']} already complete")
+    print(f"💾 Results: {args.output}")
+    return 0 if summary["error"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Travel Light Benchmark - end-to-end latency, LLM usage and memory for the real graph
+
+Drives build_conversation_graph() through scripted multi-turn conversations
+(plan -> confirm -> hotels -> flights), several at a time, against the local
+stand-ins (fake_llm + fake_providers) unless --live is given. Reports p50/p95/p99
+per turn and per agent, LLM calls and tokens per conversation, and peak RSS,
+and writes them as JSON.
+
+With --baseline, the run is compared with an earlier result and the exit code
+is 1 when any gated metric regressed by more than --tolerance, so CI can fail
+the build.
+
+Usage:
+    python benchmark.py --conversations 50 --concurrency 8 -o bench.json
+    python benchmark.py --baseline bench_main.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT = [
+    ("plan", "Plan a {days}-day {budget} trip to {destination}"),
+    ("confirm", "Yes, looks good"),
+    ("hotels", "Find hotels in {city_code} for 2 adults"),
+    ("flights", "Now find flights from NYC to {city_code}"),
+]
+DESTINATIONS = [("Paris", "PAR"), ("Rome", "ROM"), ("London", "LON"), ("Tokyo", "TYO"),
+                ("Barcelona", "BCN"), ("Lisbon", "LIS"), ("Amsterdam", "AMS"), ("Dubai", "DXB")]
+BUDGETS = ("budget", "mid-range", "luxury")
+AGENT_NODES = ("supervisor", "itinerary_agent", "hotel_agent", "flight_agent", "merge", "compact")
+
+# Metrics compared against --baseline: lower is better for all of them
+GATED_METRICS = ("turns.*.p95_ms", "agents.*.p95_ms", "llm.calls_per_conversation",
+                 "llm.tokens_per_conversation.p50", "peak_rss_mb")
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of ``values`` (q in 0..100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples_ms) -> dict:
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 2) if samples_ms else None,
+        "p50_ms": _round(percentile(samples_ms, 50)),
+        "p95_ms": _round(percentile(samples_ms, 95)),
+        "p99_ms": _round(percentile(samples_ms, 99)),
+        "max_ms": _round(max(samples_ms) if samples_ms else None),
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+def conversation_script(index):
+    destination, city_code = DESTINATIONS[index % len(DESTINATIONS)]
+    values = {"destination": destination, "city_code": city_code,
+              "days": 2 + index % 4, "budget": BUDGETS[index % len(BUDGETS)]}
+    return [(name, template.format(**values)) for name, template in SCRIPT]
+
+
+def make_recorder():
+    """Callback handler collecting per-node timings and LLM usage (created lazily: needs langchain)."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class Recorder(BaseCallbackHandler):
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.started = {}
+            self.roots = set()
+            self.agent_ms = defaultdict(list)
+            self.llm_calls = 0
+            self.tokens = 0
+
+        def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, name=None, **kwargs):
+            name = name or (serialized or {}).get("name")
+            with self.lock:
+                if parent_run_id is None:
+                    self.roots.add(run_id)
+                # Only top-level graph nodes: inner agents reuse the same names
+                elif parent_run_id in self.roots and name in AGENT_NODES:
+                    self.started[run_id] = (name, time.perf_counter())
+
+        def _chain_done(self, run_id):
+            with self.lock:
+                self.roots.discard(run_id)
+                started = self.started.pop(run_id, None)
+                if started:
+                    self.agent_ms[started[0]].append((time.perf_counter() - started[1]) * 1000)
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._chain_done(run_id)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._chain_done(run_id)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            total = usage.get("total_tokens")
+            if total is None:
+                total = sum((getattr(g.message, "usage_metadata", None) or {}).get("total_tokens", 0)
+                            for generations in response.generations for g in generations)
+            with self.lock:
+                self.llm_calls += 1
+                self.tokens += total or 0
+
+    return Recorder()
+
+
+def run_conversation(graph, index, thread_prefix):
+    from checkpointing import thread_config
+
+    recorder = make_recorder()
+    config = {**thread_config(f"{thread_prefix}-{index}"), "callbacks": [recorder]}
+    turns, errors = [], []
+    for name, text in conversation_script(index):
+        started = time.perf_counter()
+        try:
+            graph.invoke({"messages": [{"role": "user", "content": text}]}, config)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+        turns.append((name, (time.perf_counter() - started) * 1000))
+    return {"turns": turns, "agents": dict(recorder.agent_ms), "llm_calls": recorder.llm_calls,
+            "tokens": recorder.tokens, "errors": errors}
+
+
+def run_benchmark(conversations=20, concurrency=4, warmup=1):
+    """Run the scripted conversations and return the results dict."""
+    from checkpointing import get_checkpointer
+    from travel_light import build_conversation_graph
+
+    build_started = time.perf_counter()
+    graph = build_conversation_graph(checkpointer=get_checkpointer("memory"))
+    build_ms = (time.perf_counter() - build_started) * 1000
+
+    for i in range(warmup):
+        run_conversation(graph, i, "warmup")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: run_conversation(graph, i, "bench"), range(conversations)))
+    wall = time.perf_counter() - started
+
+    turn_ms, agent_ms = defaultdict(list), defaultdict(list)
+    for result in results:
+        for name, ms in result["turns"]:
+            turn_ms[name].append(ms)
+        for name, samples in result["agents"].items():
+            agent_ms[name].extend(samples)
+    conversation_ms = [sum(ms for _, ms in result["turns"]) for result in results]
+    calls = [result["llm_calls"] for result in results]
+    tokens = [result["tokens"] for result in results]
+    errors = [error for result in results for error in result["errors"]]
+
+    return {
+        "turns": {name: summarize(turn_ms[name]) for name, _ in SCRIPT},
+        "agents": {name: summarize(samples) for name, samples in sorted(agent_ms.items())},
+        "conversation": summarize(conversation_ms),
+        "llm": {
+            "calls": sum(calls),
+            "calls_per_conversation": round(sum(calls) / len(calls), 2) if calls else 0,
+            "tokens": sum(tokens),
+            "tokens_per_conversation": {"p50": _round(percentile(tokens, 50)),
+                                        "p95": _round(percentile(tokens, 95)),
+                                        "max": max(tokens) if tokens else 0},
+        },
+        "graph_build_ms": round(build_ms, 2),
+        "wall_seconds": round(wall, 3),
+        "turns_per_second": round(conversations * len(SCRIPT) / wall, 2) if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+    }
+
+
+def _lookup(results, path):
+    """Values at a dotted ``path``; a "*" segment fans out over dict keys."""
+    head, _, rest = path.partition(".")
+    if head == "*":
+        found = {}
+        for key, value in (results or {}).items():
+            for sub_path, sub_value in _lookup(value, rest).items():
+                found[f"{key}.{sub_path}" if sub_path else key] = sub_value
+        return found
+    if not isinstance(results, dict) or head not in results:
+        return {}
+    if not rest:
+        return {head: results[head]}
+    return {f"{head}.{key}": value for key, value in _lookup(results[head], rest).items()}
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of GATED_METRICS beyond ``tolerance`` (0.2 = 20% worse), as readable strings."""
+    regressions = []
+    if results.get("errors") and not baseline.get("errors"):
+        regressions.append(f"errors: 0 -> {results['errors']}")
+    for pattern in GATED_METRICS:
+        current = _lookup(results, pattern)
+        previous = _lookup(baseline, pattern)
+        for name, value in current.items():
+            before = previous.get(name)
+            if value is None or not before:
+                continue
+            if value > before * (1 + tolerance):
+                regressions.append(f"{name}: {before} -> {value} (+{(value / before - 1) * 100:.1f}%)")
+    return regressions
+
+
+def start_stand_ins(args):
+    """Start fake providers and select the fake LLM; env must be set before travel_light is imported."""
+    from fake_providers import FakeProviderServer
+
+    server = FakeProviderServer(latency=args.provider_latency, error_rate=args.provider_error_rate,
+                                seed=args.seed).start()
+    os.environ.update(server.env())
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.setdefault("LLM_FAKE_LATENCY", args.llm_latency)
+    os.environ.setdefault("LLM_FAKE_SEED", str(args.seed))
+    # Each run starts cold: no on-disk caches carried over between benchmark runs
+    os.environ["HOTEL_CACHE_BACKEND"] = "memory"
+    os.environ.pop("ITINERARY_CACHE_WARM_FILE", None)
+    return server
+
+
+def print_report(results):
+    print(f"\n📊 Turns ({results['turns_per_second']} turns/s, {results['errors']} errors)")
+    for section in ("turns", "agents"):
+        for name, stats in results[section].items():
+            print(f"   {section[:-1]:<6} {name:<16} p50 {stats['p50_ms']:>9} ms   "
+                  f"p95 {stats['p95_ms']:>9} ms   p99 {stats['p99_ms']:>9} ms   n={stats['count']}")
+    llm = results["llm"]
+    print(f"🤖 LLM: {llm['calls_per_conversation']} calls/conversation, "
+          f"{llm['tokens_per_conversation']['p50']} tokens/conversation (p50)")
+    print(f"💾 Peak RSS: {results['peak_rss_mb']} MB, graph build {results['graph_build_ms']} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Travel Light conversation graph")
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=1, help="conversations run before measuring")
+    parser.add_argument("--live", action="store_true", help="use the real OpenAI/Amadeus/AviationStack APIs")
+    parser.add_argument("--llm-latency", default="lognormal:300,0.4", help="fake model time to first token")
+    parser.add_argument("--provider-latency", default="lognormal:80,0.3", help="fake provider latency")
+    parser.add_argument("--provider-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results JSON to gate against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression, 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    server = None if args.live else start_stand_ins(args)
+    try:
+        print(f"🚀 Benchmarking {args.conversations} conversations x {len(SCRIPT)} turns, "
+              f"concurrency {args.concurrency} ({'live APIs' if args.live else 'local stand-ins'})")
+        results = run_benchmark(args.conversations, args.concurrency, args.warmup)
+    finally:
+        if server is not None:
+            server.stop()
+
+    results["config"] = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_report(results)
+    print(f"💾 Results: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Checkpointing - pluggable persistence for conversation graph state, keyed by thread id
+
+Backends (GRAPH_CHECKPOINTER):
+    sqlite    local file, survives restarts (needs langgraph-checkpoint-sqlite)
+    postgres  shared by every worker process (needs langgraph-checkpoint-postgres, POSTGRES_URI)
+    memory    one in-process store shared by all sessions of this process
+    none      no checkpointer; callers resend the full history each turn
+
+The web page and API server send only each turn's new message, so they use
+session_checkpointer_kind(), which swaps "none" for "memory".
+"""
+
+import os
+import sqlite3
+import threading
+
+_checkpointers = {}
+_lock = threading.Lock()
+
+
+def _create(kind):
+    if kind == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+    if kind == "sqlite":
+        from langgraph.checkpoint.sqlite import SqliteSaver
+        path = os.getenv("GRAPH_CHECKPOINT_PATH", "travel_light_checkpoints.sqlite3")
+        return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+    if kind == "postgres":
+        from psycopg import Connection
+        from langgraph.checkpoint.postgres import PostgresSaver
+        conn = Connection.connect(os.environ["POSTGRES_URI"], autocommit=True, prepare_threshold=0)
+        saver = PostgresSaver(conn)
+        saver.setup()
+        return saver
+    raise ValueError(f"Unknown checkpointer: {kind!r} (expected sqlite, postgres, memory or none)")
+
+
+def get_checkpointer(kind=None):
+    """Return the process-wide checkpointer for ``kind``, creating it on first use.
+
+    Falls back to the in-memory store when the requested backend's package is not installed.
+    """
+    kind = (kind or os.getenv("GRAPH_CHECKPOINTER", "sqlite")).lower()
+    if kind == "none":
+        return None
+    with _lock:
+        if kind not in _checkpointers:
+            try:
+                _checkpointers[kind] = _create(kind)
+            except ImportError as e:
+                print(f"⚠️  {kind} checkpointer unavailable ({e}); using in-memory checkpoints")
+                if "memory" not in _checkpointers:
+                    _checkpointers["memory"] = _create("memory")
+                _checkpointers[kind] = _checkpointers["memory"]
+        return _checkpointers[kind]
+
+
+def session_checkpointer_kind(kind=None) -> str:
+    """Backend for entry points that rely on the graph to keep history: "none" falls back to "memory"."""
+    kind = (kind or os.getenv("GRAPH_CHECKPOINTER", "sqlite")).lower()
+    if kind == "none":
+        print("⚠️  GRAPH_CHECKPOINTER=none would drop every earlier turn here; using in-memory checkpoints")
+        return "memory"
+    return kind
+
+
+def thread_config(thread_id: str) -> dict:
+    """Graph config selecting the checkpointed conversation ``thread_id``."""
+    return {"configurable": {"thread_id": thread_id}}
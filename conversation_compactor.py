@@ -0,0 +1,147 @@
+"""
+Conversation Compactor - keeps the per-turn prompt bounded in long sessions
+
+The last ``keep_last_turns`` user turns are kept verbatim. Older turns are
+folded into a rolling summary plus the trip slots extracted from them, and
+sent to the graph as a single summary message in front of the recent turns.
+"""
+
+import os
+
+from slot_extractor import conversation_slots
+
+SUMMARY_NAME = "conversation_summary"
+
+_encoding = None
+
+
+def _get_encoding():
+    """tiktoken's cl100k_base encoding when installed (loaded on first use), else False."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding
+
+
+def _role(message) -> str:
+    if isinstance(message, dict):
+        return message.get("role", "")
+    return {"human": "user", "ai": "assistant", "system": "system"}.get(getattr(message, "type", ""), "")
+
+
+def _text(message) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+def _is_summary(message) -> bool:
+    name = message.get("name") if isinstance(message, dict) else getattr(message, "name", None)
+    return name == SUMMARY_NAME
+
+
+def estimate_tokens(messages) -> int:
+    """Token count of the message contents (tiktoken when installed, ~4 chars/token otherwise)."""
+    encoding = _get_encoding()
+    total = 0
+    for message in messages:
+        text = _text(message)
+        total += 4 + (len(encoding.encode(text)) if encoding else len(text) // 4)
+    return total
+
+
+def _split_turns(messages):
+    """Group messages into turns, each starting at a user message."""
+    turns = []
+    for message in messages:
+        if _role(message) == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def _digest(messages, max_chars=200) -> str:
+    lines = []
+    for message in messages:
+        text = " ".join(_text(message).split())
+        if not text:
+            continue
+        if len(text) > max_chars:
+            text = text[:max_chars].rsplit(" ", 1)[0] + " ..."
+        lines.append(f"{_role(message).capitalize() or 'Message'}: {text}")
+    return "\n".join(lines)
+
+
+class ConversationCompactor:
+    """Folds old turns into a rolling summary so the prompt stays within a token budget.
+
+    ``summarizer`` is an optional callable ``(previous_summary, folded_text) -> str``
+    (e.g. a cheap LLM call). Without one, folded turns are kept as truncated
+    one-line digests and the oldest digest lines roll off past ``max_summary_chars``.
+    """
+
+    def __init__(self, keep_last_turns=4, token_budget=2000, summarizer=None, max_summary_chars=2000):
+        self.keep_last_turns = keep_last_turns
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.max_summary_chars = max_summary_chars
+
+    def _fold(self, summary, folded):
+        text = _digest(folded)
+        if not text:
+            return summary
+        if self.summarizer is not None:
+            return self.summarizer(summary, text)
+        summary = f"{summary}\n{text}".strip()
+        while len(summary) > self.max_summary_chars and "\n" in summary:
+            summary = summary.split("\n", 1)[1]
+        return summary[-self.max_summary_chars:]
+
+    def _summary_message(self, summary, slots):
+        details = ", ".join(f"{key}: {slots[key]}" for key in ("destination", "days", "budget") if slots.get(key))
+        parts = []
+        if summary:
+            parts.append(f"Summary of the earlier conversation:\n{summary}")
+        if details:
+            parts.append(f"Trip details collected so far: {details}")
+        return {"role": "system", "name": SUMMARY_NAME, "content": "\n\n".join(parts)}
+
+    def compact(self, messages, summary="", slots=None) -> dict:
+        """Return ``{"messages", "summary", "slots", "folded"}`` for the next graph call."""
+        messages = [m for m in messages if not _is_summary(m)]
+        slots = dict(slots or {})
+        turns = _split_turns(messages)
+
+        keep = turns[-self.keep_last_turns:] if self.keep_last_turns else turns[-1:]
+        folded = turns[:len(turns) - len(keep)]
+        # Past the token budget, fold further turns but always keep the latest one
+        while len(keep) > 1 and estimate_tokens([m for turn in keep for m in turn]) > self.token_budget:
+            folded.append(keep.pop(0))
+
+        if not folded:
+            kept = [m for turn in keep for m in turn]
+            if summary or slots:
+                kept = [self._summary_message(summary, slots)] + kept
+            return {"messages": kept, "summary": summary, "slots": slots, "folded": 0}
+
+        folded_messages = [m for turn in folded for m in turn]
+        slots.update(conversation_slots(folded_messages))
+        summary = self._fold(summary, folded_messages)
+        kept = [m for turn in keep for m in turn]
+        return {
+            "messages": [self._summary_message(summary, slots)] + kept,
+            "summary": summary,
+            "slots": slots,
+            "folded": len(folded_messages),
+        }
+
+
+def compactor_from_env() -> ConversationCompactor:
+    """Build the compactor configured by CONVERSATION_* environment variables."""
+    return ConversationCompactor(
+        keep_last_turns=int(os.getenv("CONVERSATION_KEEP_TURNS", "4")),
+        token_budget=int(os.getenv("CONVERSATION_TOKEN_BUDGET", "2000")),
+    )
@@ -0,0 +1,141 @@
+"""
+Conversation Streaming - incremental token and agent events from the travel graph
+
+Both front ends consume the same event dicts:
+    {"type": "agent", "node": name}                      an agent/node started producing output
+    {"type": "token", "node": name, "content": text}     a streamed LLM token
+    {"type": "final", "state": state}                    the final graph state (last event)
+
+Every agent is a nested react-agent graph, so the graph is streamed with
+subgraphs=True to receive its LLM tokens as they are generated. Tokens come
+once: after an agent has streamed its reply, the supervisor's relay of it
+only streams what it adds (e.g. "Does this look good to you?"), and the merge
+node's join of fanned-out replies is not streamed again.
+
+transcript() rebuilds what the user saw from a checkpointed state.
+"""
+
+STREAM_MODES = ["messages", "updates", "values"]
+# Nodes that repeat replies agents have already streamed in the same turn
+RELAY_NODES = ("supervisor", "merge")
+
+
+def _accumulate(text_id, text, message, content):
+    """(id, text) of the message ``content`` belongs to, with ``content`` appended."""
+    message_id = getattr(message, "id", None)
+    if message_id != text_id:
+        return message_id, content
+    return text_id, text + content
+
+
+def _node_name(metadata):
+    # Nested agent calls report their inner node ("agent"); the checkpoint
+    # namespace starts with the top-level graph node, e.g. "hotel_agent:<id>|agent:<id>"
+    namespace = metadata.get("langgraph_checkpoint_ns", "")
+    if namespace:
+        return namespace.split("|")[0].split(":")[0]
+    return metadata.get("langgraph_node", "")
+
+
+class _EventTranslator:
+    """Turns langgraph multi-mode stream items into front-end events."""
+
+    def __init__(self):
+        self.current_node = None
+        self.final_state = None
+        self.agent_streamed = False
+        # Latest agent reply and relay message streamed so far, as (message id, text)
+        self._reply = (None, "")
+        self._relay = (None, "")
+
+    def translate(self, namespace, mode, chunk):
+        # Only the top-level graph's state and node updates; agents' inner steps are not user-facing
+        if mode == "values":
+            if not namespace:
+                self.final_state = chunk
+            return
+        if mode == "updates":
+            if namespace:
+                return
+            for node in chunk or {}:
+                if node != self.current_node:
+                    self.current_node = node
+                    yield {"type": "agent", "node": node}
+            return
+
+        message, metadata = chunk
+        content = getattr(message, "content", "")
+        if not isinstance(content, str) or not content:
+            return
+        # Only AI output is user-facing; tool results are surfaced by the agents
+        if getattr(message, "type", "") not in ("AIMessageChunk", "ai"):
+            return
+        node = _node_name(metadata)
+        if node not in RELAY_NODES:
+            self.agent_streamed = True
+            self._reply = _accumulate(*self._reply, message, content)
+        elif self.agent_streamed:
+            content = self._relay_extra(node, message, content)
+            if not content:
+                return
+        if node and node != self.current_node:
+            self.current_node = node
+            yield {"type": "agent", "node": node}
+        yield {"type": "token", "node": node, "content": content}
+
+    def _relay_extra(self, node, message, content):
+        """The part of a relay chunk that goes beyond the agent reply it repeats ("" while it repeats it)."""
+        if node == "merge":
+            return ""
+        self._relay = _accumulate(*self._relay, message, content)
+        reply, relay = self._reply[1], self._relay[1]
+        streamed = len(relay) - len(content)
+        if len(relay) <= len(reply) or not relay.startswith(reply):
+            return ""
+        return relay[max(streamed, len(reply)):]
+
+
+def transcript(messages):
+    """[{"role", "content"}] as shown to the user: each user message and the final reply of its turn.
+
+    Agent replies relayed by the supervisor or joined by the fan-out merge are
+    stored more than once; only the last AI message of each turn was displayed.
+    """
+    shown, reply = [], None
+    for message in messages:
+        kind = getattr(message, "type", "")
+        if kind == "human":
+            if reply:
+                shown.append({"role": "assistant", "content": reply})
+            shown.append({"role": "user", "content": message.content})
+            reply = None
+        elif kind == "ai" and message.content and not getattr(message, "tool_calls", None):
+            reply = message.content
+    if reply:
+        shown.append({"role": "assistant", "content": reply})
+    return shown
+
+
+def stream_conversation(graph, state, config=None):
+    """Run one turn and yield agent/token events, ending with the final state."""
+    if not hasattr(graph, "stream"):
+        yield {"type": "final", "state": graph.invoke(state)}
+        return
+
+    translator = _EventTranslator()
+    for namespace, mode, chunk in graph.stream(state, config, stream_mode=STREAM_MODES, subgraphs=True):
+        yield from translator.translate(namespace, mode, chunk)
+    yield {"type": "final", "state": translator.final_state or {}}
+
+
+async def astream_conversation(graph, state, config=None):
+    """Async version of stream_conversation, driven by graph.astream."""
+    if not hasattr(graph, "astream"):
+        yield {"type": "final", "state": await graph.ainvoke(state)}
+        return
+
+    translator = _EventTranslator()
+    async for namespace, mode, chunk in graph.astream(state, config, stream_mode=STREAM_MODES, subgraphs=True):
+        for event in translator.translate(namespace, mode, chunk):
+            yield event
+    yield {"type": "final", "state": translator.final_state or {}}
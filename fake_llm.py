@@ -0,0 +1,244 @@
+"""
+Fake LLM - deterministic, tool-calling chat model for offline load tests
+
+FakeToolCallingChatModel plays every role in the travel graph without a
+network: as the supervisor it calls the transfer tools, as the flight/hotel
+agents it calls their search tools and summarises the results, and without
+tools it writes an itinerary sized to the requested number of days. Replies
+depend only on the conversation; latency is sampled from a configurable,
+seeded distribution so runs are repeatable.
+
+Select it with LLM_PROVIDER=fake (see llm_provider.py).
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from conversation_compactor import estimate_tokens
+from fake_providers import Latency
+from slot_extractor import conversation_slots
+
+CITY_CODES = {
+    "paris": "PAR", "london": "LON", "rome": "ROM", "bali": "DPS", "tokyo": "TYO",
+    "new york": "NYC", "barcelona": "BCN", "lisbon": "LIS", "amsterdam": "AMS", "dubai": "DXB",
+}
+FIXTURE_CHECK_IN = "2025-06-01"
+CONFIRMATIONS = ("yes", "looks good", "finalize", "sounds good", "perfect")
+
+
+def _role(message):
+    return getattr(message, "type", None) or message.get("role")
+
+
+def _text(message):
+    content = getattr(message, "content", None) if not isinstance(message, dict) else message.get("content")
+    return content if isinstance(content, str) else str(content or "")
+
+
+def _last_user_text(messages):
+    for message in reversed(messages):
+        if _role(message) in ("human", "user"):
+            return _text(message)
+    return ""
+
+
+def _city_code(text, slots):
+    # "from NYC to ROM": the destination is the last code mentioned
+    codes = re.findall(r"\b[A-Z]{3}\b", text)
+    if codes:
+        return codes[-1]
+    destination = (slots.get("destination") or "").lower()
+    return CITY_CODES.get(destination, "PAR")
+
+
+def _legs(text, slots, days):
+    """One consecutive stay of ``days`` nights per city code mentioned, for batch tools."""
+    codes = re.findall(r"\b[A-Z]{3}\b", text) or [_city_code(text, slots)]
+    start = int(FIXTURE_CHECK_IN[-2:])
+    return [{"city": code, "check_in": f"2025-06-{start + i * days:02d}",
+             "check_out": f"2025-06-{start + (i + 1) * days:02d}", "adults": 2}
+            for i, code in enumerate(codes)]
+
+
+def _fill_args(schema, messages):
+    """Arguments for a tool call, filled from the conversation by parameter name and type."""
+    text = _last_user_text(messages)
+    slots = conversation_slots(messages)
+    days = slots.get("days") or 3
+    args = {}
+    for name, spec in schema.get("properties", {}).items():
+        if name in ("city_code", "city", "destination", "origin"):
+            codes = re.findall(r"\b[A-Z]{3}\b", text)
+            if name != "origin":
+                args[name] = _city_code(text, slots)
+            else:
+                args[name] = codes[0] if len(codes) > 1 else "NYC"
+        elif name in ("check_in", "departure_date", "date", "start_date"):
+            args[name] = FIXTURE_CHECK_IN
+        elif name in ("check_out", "return_date", "end_date"):
+            args[name] = f"2025-06-{1 + days:02d}"
+        elif name in ("adults", "travelers", "passengers"):
+            args[name] = 2
+        elif name == "legs":
+            args[name] = _legs(text, slots, days)
+        elif name == "budget":
+            args[name] = slots.get("budget") or spec.get("default", "")
+        elif "default" in spec:
+            args[name] = spec["default"]
+        elif spec.get("type") == "integer":
+            args[name] = 1
+        elif spec.get("type") == "array":
+            args[name] = [_city_code(text, slots)]
+        else:
+            args[name] = text
+    return args
+
+
+def _itinerary(messages):
+    slots = conversation_slots(messages)
+    destination = slots.get("destination") or "your destination"
+    days = slots.get("days") or 3
+    budget = slots.get("budget") or "mid-range"
+    lines = [f"{days}-day {budget} itinerary for {destination}:"]
+    for day in range(1, days + 1):
+        lines.append(
+            f"Day {day}: Morning walking tour of a historic quarter of {destination}, lunch at a "
+            f"{budget} local restaurant, afternoon museum or market visit, sunset viewpoint and "
+            f"dinner near the old town. Tip: buy transit passes early and book popular sights ahead."
+        )
+    return "\n".join(lines)
+
+
+def scripted_reply(messages, tools) -> dict:
+    """The reply a scripted travel assistant gives: {"content": str, "tool_calls": [...]}."""
+    tool_schemas = {t["function"]["name"]: t["function"].get("parameters", {}) for t in tools or []}
+    last = messages[-1] if messages else None
+    transfers = {name for name in tool_schemas if name.startswith("transfer_to_")}
+
+    if transfers:
+        # Supervisor: relay an agent's reply, otherwise route on the user's latest message
+        if last is not None and _role(last) in ("ai", "assistant", "tool"):
+            content = _text(last)
+            if getattr(last, "name", None) == "itinerary_agent":
+                content += "\n\nDoes this look good to you?"
+            return {"content": content, "tool_calls": []}
+        text = _last_user_text(messages).lower()
+        targets = []
+        if "hotel" in text and "transfer_to_hotel_agent" in transfers:
+            targets.append("transfer_to_hotel_agent")
+        if "flight" in text and "transfer_to_flight_agent" in transfers:
+            targets.append("transfer_to_flight_agent")
+        if not targets and conversation_slots(messages[-1:]).get("destination"):
+            targets.append("transfer_to_itinerary_agent")
+        if targets:
+            return {"content": "", "tool_calls": [{"name": name, "args": {}} for name in targets]}
+        if any(word in text for word in CONFIRMATIONS):
+            return {"content": "Great! What is your departure city, travel dates, preferred hotel rating "
+                               "and number of travelers?", "tool_calls": []}
+        return {"content": "Where would you like to go, for how many days, and on what budget?",
+                "tool_calls": []}
+
+    if tool_schemas:
+        # Search agent: call its tool once, then summarise the tool result
+        if last is not None and _role(last) == "tool" and getattr(last, "name", None) in tool_schemas:
+            return {"content": f"Here are the best options I found:\n{_text(last)}", "tool_calls": []}
+        name, schema = next(iter(tool_schemas.items()))
+        batch = [item for item in tool_schemas.items() if "legs" in item[1].get("properties", {})]
+        if batch and len(re.findall(r"\b[A-Z]{3}\b", _last_user_text(messages))) > 1:
+            # Several cities: one batch call instead of one call per city
+            name, schema = batch[0]
+        return {"content": "", "tool_calls": [{"name": name, "args": _fill_args(schema, messages)}]}
+
+    return {"content": _itinerary(messages), "tool_calls": []}
+
+
+class FakeToolCallingChatModel(BaseChatModel):
+    """Offline chat model that supports bind_tools and simulates provider latency.
+
+    Each call waits ``latency`` (time to first token) plus ``ms_per_token`` per
+    completion token, and reports token usage like the OpenAI integration does.
+    """
+
+    model_name: str = "fake-tool-model"
+    latency: str = "fixed:0"
+    ms_per_token: float = 0.0
+    seed: Optional[int] = 0
+    _sampler: Any = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-calling"
+
+    def _first_token_delay(self) -> float:
+        if self._sampler is None:
+            self._sampler = Latency(self.latency, self.seed)
+        return self._sampler.sample()
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _reply(self, messages: List, tools):
+        reply = scripted_reply(messages, tools)
+        digest = hashlib.sha1(json.dumps([_text(m) for m in messages]).encode()).hexdigest()[:12]
+        tool_calls = [
+            {"name": call["name"], "args": call["args"], "id": f"call_{digest}_{i}", "type": "tool_call"}
+            for i, call in enumerate(reply["tool_calls"])
+        ]
+        prompt_tokens = estimate_tokens(messages)
+        completion_tokens = max(1, len(reply["content"]) // 4 + 10 * len(tool_calls))
+        usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        message = AIMessage(content=reply["content"], tool_calls=tool_calls, usage_metadata=usage)
+        # (time to first token, time to generate the rest)
+        delays = (self._first_token_delay(), completion_tokens * self.ms_per_token / 1000.0)
+        llm_output = {"model_name": self.model_name,
+                      "token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                      "total_tokens": usage["total_tokens"]}}
+        return message, delays, llm_output
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        message, delays, llm_output = self._reply(messages, tools)
+        time.sleep(sum(delays))
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=llm_output)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        message, delays, llm_output = self._reply(messages, tools)
+        await asyncio.sleep(sum(delays))
+        return ChatResult(generations=[ChatGeneration(message=message)], llm_output=llm_output)
+
+    @staticmethod
+    def _chunks(message):
+        if message.tool_calls:
+            return [AIMessageChunk(content="", usage_metadata=message.usage_metadata, tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ])]
+        words = re.findall(r"\S+\s*", message.content) or [""]
+        return [AIMessageChunk(content=word, usage_metadata=message.usage_metadata if i == 0 else None)
+                for i, word in enumerate(words)]
+
+    def _stream(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        message, (first_token, generation), _ = self._reply(messages, tools)
+        chunks = self._chunks(message)
+        time.sleep(first_token)
+        for chunk in chunks:
+            yield ChatGenerationChunk(message=chunk)
+            time.sleep(generation / len(chunks))
+
+    async def _astream(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+        message, (first_token, generation), _ = self._reply(messages, tools)
+        chunks = self._chunks(message)
+        await asyncio.sleep(first_token)
+        for chunk in chunks:
+            yield ChatGenerationChunk(message=chunk)
+            await asyncio.sleep(generation / len(chunks))
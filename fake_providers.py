@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Fake Providers - local Amadeus and AviationStack stand-ins with canned fixtures
+
+One stdlib HTTP server answers the endpoints Travel Light calls:
+
+    POST /v1/security/oauth2/token      Amadeus client-credentials token
+    GET  /v2/shopping/hotel-offers      Amadeus hotel offers for ?cityCode=
+    GET  /v2/shopping/flight-offers     Amadeus flight offers, price-sorted, honouring max/nonStop/travelClass
+    GET  /v1/flights                    AviationStack flights for ?dep_iata=&arr_iata=, paged by limit/offset
+
+Fixtures are generated deterministically from the request parameters, so the
+same search always returns the same hotels and flights. Every response can be
+delayed by a latency distribution (see Latency, also used by fake_llm) and a
+fraction of requests can fail with 503 to exercise the client's retries.
+
+Run standalone:  python fake_providers.py --port 8081 --latency lognormal:120,0.4
+then point AMADEUS_BASE_URL and AVIATIONSTACK_BASE_URL at it.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FAKE_TOKEN = "fake-amadeus-token"
+
+HOTEL_NAMES = ("Grand", "Plaza", "Central", "Boutique", "Harbour", "Garden", "Riverside", "Old Town",
+               "Skyline", "Station", "Palace", "Budget Inn", "Hostel", "Suites", "Resort", "Lodge")
+CABIN_FARE_MULTIPLIERS = {"ECONOMY": 1.0, "PREMIUM_ECONOMY": 1.7, "BUSINESS": 3.8, "FIRST": 6.5}
+AIRLINES = (("British Airways", "BA"), ("Delta Air Lines", "DL"), ("American Airlines", "AA"),
+            ("Air France", "AF"), ("Lufthansa", "LH"), ("KLM", "KL"), ("United Airlines", "UA"))
+
+
+class Latency:
+    """Delay sampler for specs like "fixed:200", "uniform:100,400", "normal:300,50"
+    or "lognormal:300,0.5" (milliseconds; lognormal takes the median and sigma)."""
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec="fixed:0", seed=None):
+        kind, _, args = spec.partition(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"unknown latency distribution: {spec!r}")
+        self.kind = kind
+        self.args = [float(value) for value in args.split(",") if value.strip()] or [0.0]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """One delay, in seconds."""
+        a = self.args[0]
+        b = self.args[1] if len(self.args) > 1 else 0.0
+        with self._lock:
+            if self.kind == "uniform":
+                ms = self._rng.uniform(a, b)
+            elif self.kind == "normal":
+                ms = self._rng.gauss(a, b)
+            elif self.kind == "lognormal":
+                ms = a * math.exp(self._rng.gauss(0.0, b))
+            else:
+                ms = a
+        return max(0.0, ms) / 1000.0
+
+
+def hotel_offers_fixture(city_code, check_in, check_out, adults=1, count=20):
+    """Amadeus v2 hotel-offers payload for ``city_code``; totals are a nightly rate times the nights."""
+    rng = random.Random(f"hotels-{city_code}")
+    try:
+        nights = max(1, (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days)
+    except ValueError:
+        nights = 1
+    data = []
+    for i in range(count):
+        rating = rng.randint(1, 5)
+        base = 40 + rating * rng.uniform(25, 70)
+        offers = []
+        for j in range(rng.randint(1, 3)):
+            offers.append({
+                "id": f"{city_code}{i:03d}OFFER{j}",
+                "checkInDate": check_in,
+                "checkOutDate": check_out,
+                "guests": {"adults": int(adults)},
+                "room": {"typeEstimated": {"category": rng.choice(("STANDARD_ROOM", "SUPERIOR_ROOM", "SUITE"))}},
+                "price": {"currency": "USD", "total": f"{base * nights * (1 + 0.15 * j):.2f}"},
+            })
+        rng.shuffle(offers)  # the cheapest room is not necessarily listed first
+        data.append({
+            "type": "hotel-offers",
+            "hotel": {"hotelId": f"{city_code}{i:03d}", "name": f"{city_code} {rng.choice(HOTEL_NAMES)} {i}",
+                      "cityCode": city_code, "rating": str(rating)},
+            "available": True,
+            "offers": offers,
+        })
+    return {"data": data}
+
+
+def flight_offers_fixture(origin, destination, departure_date, return_date="", adults=1, cabin="ECONOMY",
+                          nonstop=False, max_results=250, count=30):
+    """Amadeus v2 flight-offers payload: ``count`` offers for the route and date, cheapest first."""
+    rng = random.Random(f"offers-{origin}-{destination}-{departure_date}")
+    carriers = {}
+    offers = []
+    for i in range(count):
+        airline, code = rng.choice(AIRLINES)
+        carriers[code] = airline.upper()
+        stops = rng.choice((0, 0, 1, 1, 2))
+        hour, minutes = rng.randint(5, 22), rng.randint(90, 900)
+        itineraries = [_itinerary(code, rng, origin, destination, departure_date, hour, minutes, stops)]
+        if return_date:
+            itineraries.append(_itinerary(code, rng, destination, origin, return_date, rng.randint(5, 22),
+                                          minutes, stops))
+        fare = (120 + minutes * rng.uniform(0.4, 0.9)) * (1.25 - 0.12 * stops) * CABIN_FARE_MULTIPLIERS.get(cabin, 1.0)
+        total = f"{fare * int(adults) * (2 if return_date else 1):.2f}"
+        offers.append({
+            "type": "flight-offer", "id": str(i + 1), "source": "GDS", "numberOfBookableSeats": rng.randint(1, 9),
+            "itineraries": itineraries,
+            "price": {"currency": "USD", "total": total, "grandTotal": total},
+            "validatingAirlineCodes": [code],
+            "travelerPricings": [{"travelerId": str(t + 1), "fareDetailsBySegment": [{"cabin": cabin}]}
+                                 for t in range(int(adults))],
+        })
+    if nonstop:
+        offers = [o for o in offers if len(o["itineraries"][0]["segments"]) == 1]
+    offers.sort(key=lambda o: float(o["price"]["grandTotal"]))
+    offers = offers[:int(max_results)]
+    return {"meta": {"count": len(offers)}, "data": offers, "dictionaries": {"carriers": carriers}}
+
+
+def _itinerary(code, rng, origin, destination, day, hour, minutes, stops):
+    """One itinerary of ``stops + 1`` equal segments covering ``minutes``."""
+    legs = stops + 1
+    hubs = [rng.choice(("AMS", "CDG", "FRA", "LHR", "IST", "DXB")) for _ in range(stops)]
+    points = [origin, *hubs, destination]
+    start = hour * 60
+    segments = []
+    for leg in range(legs):
+        depart = start + leg * minutes // legs
+        arrive = start + (leg + 1) * minutes // legs
+        segments.append({
+            "departure": {"iataCode": points[leg], "at": _at(day, depart)},
+            "arrival": {"iataCode": points[leg + 1], "at": _at(day, arrive)},
+            "carrierCode": code, "number": str(rng.randint(100, 9999)), "numberOfStops": 0,
+        })
+    return {"duration": f"PT{minutes // 60}H{minutes % 60}M", "segments": segments}
+
+
+def _at(day, minutes):
+    days, minutes = divmod(minutes, 24 * 60)
+    stamp = f"{day}T{minutes // 60:02d}:{minutes % 60:02d}:00"
+    if days:
+        stamp = f"{(date.fromisoformat(day) + timedelta(days=days)).isoformat()}{stamp[10:]}"
+    return stamp
+
+
+def flights_fixture(dep_iata, arr_iata, flight_date, count=10, limit=100, offset=0):
+    """AviationStack /v1/flights payload for a route and date: page ``offset``..``offset + limit`` of ``count``."""
+    rng = random.Random(f"flights-{dep_iata}-{arr_iata}-{flight_date}")
+    data = []
+    for i in range(count):
+        airline, code = rng.choice(AIRLINES)
+        number = str(rng.randint(100, 9999))
+        hour = 6 + i * 16 // max(count, 1)
+        data.append({
+            "flight_date": flight_date,
+            "flight_status": "scheduled",
+            "departure": {"iata": dep_iata, "scheduled": f"{flight_date}T{hour:02d}:{rng.choice((0, 15, 30, 45)):02d}:00+00:00"},
+            "arrival": {"iata": arr_iata, "scheduled": f"{flight_date}T{(hour + 7) % 24:02d}:00:00+00:00"},
+            "airline": {"name": airline, "iata": code},
+            "flight": {"number": number, "iata": f"{code}{number}"},
+        })
+    page = data[offset:offset + limit]
+    return {"pagination": {"limit": limit, "offset": offset, "count": len(page), "total": count}, "data": page}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real providers
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=()):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Streaming clients hang up once they have read enough of a large payload
+            self.close_connection = True
+
+    def _simulate(self, path):
+        """Count the request, apply latency and maybe fail it; True when the request may proceed."""
+        server = self.server
+        with server.lock:
+            server.requests[path] += 1
+            fail = server.rng.random() < server.error_rate
+        time.sleep(server.latency.sample())
+        if fail:
+            self._send(503, {"errors": [{"title": "injected failure"}]}, [("Retry-After", "0")])
+            return False
+        return True
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+        if url.path != "/v1/security/oauth2/token":
+            return self._send(404, {"error": "not found"})
+        if not self._simulate(url.path):
+            return
+        if form.get("grant_type") != ["client_credentials"]:
+            return self._send(400, {"error": "unsupported_grant_type"})
+        self._send(200, {"type": "amadeusOAuth2Token", "access_token": FAKE_TOKEN,
+                         "token_type": "Bearer", "expires_in": 1799, "state": "approved"})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        handler = self.server.routes.get(url.path)
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+        if not self._simulate(url.path):
+            return
+        handler(self, query)
+
+    def hotel_offers(self, query):
+        if self.headers.get("Authorization") != f"Bearer {FAKE_TOKEN}":
+            return self._send(401, {"errors": [{"code": 38190, "title": "Invalid access token"}]})
+        if "cityCode" not in query:
+            return self._send(400, {"errors": [{"title": "cityCode is required"}]})
+        self._send(200, hotel_offers_fixture(query["cityCode"], query.get("checkInDate", ""),
+                                             query.get("checkOutDate", ""), query.get("adults", 1),
+                                             self.server.hotels_per_city))
+
+    def flight_offers(self, query):
+        if self.headers.get("Authorization") != f"Bearer {FAKE_TOKEN}":
+            return self._send(401, {"errors": [{"code": 38190, "title": "Invalid access token"}]})
+        missing = [name for name in ("originLocationCode", "destinationLocationCode", "departureDate")
+                   if name not in query]
+        if missing:
+            return self._send(400, {"errors": [{"title": f"{', '.join(missing)} is required"}]})
+        self._send(200, flight_offers_fixture(
+            query["originLocationCode"], query["destinationLocationCode"], query["departureDate"],
+            query.get("returnDate", ""), int(query.get("adults", 1)), query.get("travelClass", "ECONOMY"),
+            query.get("nonStop") == "true", int(query.get("max", 250)), self.server.flights_per_route))
+
+    def flights(self, query):
+        if not query.get("access_key"):
+            return self._send(401, {"error": {"code": "missing_access_key"}})
+        self._send(200, flights_fixture(query.get("dep_iata", "JFK"), query.get("arr_iata", "LHR"),
+                                        query.get("flight_date", "2025-06-01"), self.server.flights_per_route,
+                                        int(query.get("limit", 100)), int(query.get("offset", 0))))
+
+
+class FakeProviderServer:
+    """Background HTTP server hosting both fake providers.
+
+    ``latency`` is a Latency spec applied to every request and
+    ``error_rate`` the fraction of requests answered with 503.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0", error_rate=0.0,
+                 hotels_per_city=20, seed=0, flights_per_route=30):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = Latency(latency, seed)
+        self.httpd.error_rate = error_rate
+        self.httpd.hotels_per_city = hotels_per_city
+        self.httpd.flights_per_route = flights_per_route
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = Counter()
+        self.httpd.routes = {
+            "/v2/shopping/hotel-offers": _Handler.hotel_offers,
+            "/v2/shopping/flight-offers": _Handler.flight_offers,
+            "/v1/flights": _Handler.flights,
+        }
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Environment variables that point Travel Light at this server."""
+        return {
+            "AMADEUS_BASE_URL": self.base_url,
+            "AVIATIONSTACK_BASE_URL": self.base_url,
+            "AMADEUS_API_KEY": "fake-key",
+            "AMADEUS_API_SECRET": "fake-secret",
+            "AVIATIONSTACK_API_KEY": "fake-key",
+        }
+
+    def request_counts(self) -> dict:
+        with self.httpd.lock:
+            return dict(self.httpd.requests)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-providers", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fake Amadeus and AviationStack APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. lognormal:120,0.4 (milliseconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hotels-per-city", type=int, default=20)
+    parser.add_argument("--flights-per-route", type=int, default=30)
+    args = parser.parse_args()
+
+    server = FakeProviderServer(args.host, args.port, args.latency, args.error_rate, args.hotels_per_city,
+                                flights_per_route=args.flights_per_route)
+    print(f"🧪 Fake providers listening on {server.base_url}")
+    print("💡 Point Travel Light at them with:")
+    for name, value in server.env().items():
+        print(f"   export {name}={value}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Fake providers stopped.")
@@ -0,0 +1,394 @@
+"""
+Flight Search - parameterized flight offers over a date range, ranked top-k
+
+Amadeus Flight Offers Search is the primary source. Route, date, cabin,
+passengers and non-stop are filtered by Amadeus, which also sorts the offers
+by price and caps how many it returns. Without Amadeus credentials, or when
+Amadeus fails for a date, the AviationStack schedule API answers instead. It
+is filtered by route, date and status and paged lazily until enough flights
+arrive. It has no fares, so its flights rank by departure time. Each date in
+the range is one request; they run concurrently and the merged offers are
+ranked into a top-k. Response bodies are streamed through json_stream and each
+offer is reduced to a FlightOffer as soon as it is decoded.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from hotel_cache import normalize_date
+from iata_index import resolution_note, resolve_airport_code, resolve_location_code
+from json_stream import ArrayStream
+from provider_client import abody_text, aclose_response, aiter_body, body_text, get_provider_client, iter_body
+
+CABINS = ("ECONOMY", "PREMIUM_ECONOMY", "BUSINESS", "FIRST")
+MAX_DATE_SPAN = int(os.getenv("FLIGHT_MAX_DATE_SPAN", "7"))
+FANOUT_WORKERS = int(os.getenv("FLIGHT_FANOUT_WORKERS", "4"))
+TOP_K = int(os.getenv("FLIGHT_TOP_K", "5"))
+AVIATIONSTACK_PAGE_SIZE = 100
+AVIATIONSTACK_MAX_PAGES = 5
+
+_ISO_DURATION = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+
+
+class FlightSearchError(Exception):
+    """Raised when no provider could answer any date in the range."""
+
+
+def normalize_flight_search(origin, destination, departure_date, departure_date_end="", return_date="",
+                            cabin="ECONOMY", adults=1, nonstop=False) -> dict:
+    """Canonical search parameters; departure dates are expanded into ``dates`` (at most MAX_DATE_SPAN).
+
+    ``requested_days`` is the length of the asked-for range, so a truncated range can be reported;
+    ``notes`` say how places that were not named exactly were read ("interpreted 'Pariss' as ...").
+
+    Places may be names or codes. ``origin``/``destination`` keep a city code when a city was
+    named (Amadeus searches all its airports); ``*_airport`` is its main airport for AviationStack.
+    """
+    cabin = str(cabin or "ECONOMY").strip().upper().replace(" ", "_")
+    if cabin not in CABINS:
+        raise ValueError(f"Unknown cabin class: {cabin!r} (expected one of {', '.join(CABINS)})")
+    first = date.fromisoformat(normalize_date(departure_date))
+    last = date.fromisoformat(normalize_date(departure_date_end)) if departure_date_end else first
+    if last < first:
+        raise ValueError("departure_date_end is before departure_date")
+    span = min((last - first).days + 1, MAX_DATE_SPAN)
+    return {
+        "origin": resolve_location_code(origin),
+        "destination": resolve_location_code(destination),
+        "origin_airport": resolve_airport_code(origin),
+        "destination_airport": resolve_airport_code(destination),
+        "dates": [(first + timedelta(days=i)).isoformat() for i in range(span)],
+        "requested_days": (last - first).days + 1,
+        "notes": [note for note in (resolution_note(origin), resolution_note(destination)) if note],
+        "return_date": normalize_date(return_date) if return_date else "",
+        "cabin": cabin,
+        "adults": max(1, int(adults)),
+        "nonstop": bool(nonstop),
+    }
+
+
+def _minutes(duration):
+    match = _ISO_DURATION.match(duration or "")
+    if not match:
+        return None
+    return int(match.group(1) or 0) * 60 + int(match.group(2) or 0)
+
+
+class FlightOffer:
+    """One ranked flight; ``price`` is None for schedule-only (AviationStack) flights."""
+
+    __slots__ = ("price", "currency", "carrier", "flight", "departure", "arrival", "stops",
+                 "duration_minutes", "cabin", "return_departure")
+
+    def __init__(self, price, currency, carrier, flight, departure, arrival, stops=0, duration_minutes=None,
+                 cabin=None, return_departure=None):
+        self.price = price
+        self.currency = currency
+        self.carrier = carrier
+        self.flight = flight
+        self.departure = departure
+        self.arrival = arrival
+        self.stops = stops
+        self.duration_minutes = duration_minutes
+        self.cabin = cabin
+        self.return_departure = return_departure
+
+    def __repr__(self):
+        return f"FlightOffer({self.flight}, {self.departure}, {self.price} {self.currency})"
+
+
+def _amadeus_offer(offer, cabin):
+    """FlightOffer with the carrier still a code; names come from ``dictionaries``, which follows ``data``."""
+    outbound = offer["itineraries"][0]
+    segments = outbound["segments"]
+    code = (offer.get("validatingAirlineCodes") or [segments[0]["carrierCode"]])[0]
+    inbound = offer["itineraries"][1]["segments"][0]["departure"]["at"] if len(offer["itineraries"]) > 1 else None
+    return FlightOffer(
+        price=float(offer["price"].get("grandTotal") or offer["price"]["total"]),
+        currency=offer["price"].get("currency", ""),
+        carrier=code,
+        flight=f"{segments[0]['carrierCode']}{segments[0]['number']}",
+        departure=segments[0]["departure"]["at"],
+        arrival=segments[-1]["arrival"]["at"],
+        stops=len(segments) - 1,
+        duration_minutes=_minutes(outbound.get("duration")),
+        cabin=cabin,
+        return_departure=inbound,
+    )
+
+
+def _aviationstack_flight(row):
+    return FlightOffer(
+        price=None,
+        currency="",
+        carrier=(row.get("airline") or {}).get("name") or "Unknown airline",
+        flight=(row.get("flight") or {}).get("iata") or "",
+        departure=(row.get("departure") or {}).get("scheduled") or "",
+        arrival=(row.get("arrival") or {}).get("scheduled") or "",
+    )
+
+
+def _name_carriers(offers, fields):
+    carriers = (fields.get("dictionaries") or {}).get("carriers") or {}
+    for offer in offers:
+        offer.carrier = carriers.get(offer.carrier, offer.carrier).title()
+    return offers
+
+
+def _more_pages(fields, rows):
+    pagination = fields.get("pagination") or {}
+    return pagination.get("offset", 0) + rows < pagination.get("total", 0) and rows > 0
+
+
+def rank_key(offer):
+    """Cheapest first, then earliest departure, fewest stops and shortest flight."""
+    price = offer.price if offer.price is not None else math.inf
+    duration = offer.duration_minutes if offer.duration_minutes is not None else math.inf
+    return (price, offer.departure, offer.stops, duration)
+
+
+def top_offers(offers, k=TOP_K):
+    """The best ``k`` offers in O(n log k)."""
+    return heapq.nsmallest(k, offers, key=rank_key)
+
+
+def _clock(timestamp):
+    return timestamp[11:16] if len(timestamp) >= 16 else timestamp
+
+
+def _notes(query):
+    """Trailing "Note:" lines: places read loosely and departure dates left unsearched."""
+    notes = list(query.get("notes", ()))
+    requested, searched = query.get("requested_days", len(query["dates"])), len(query["dates"])
+    if requested > searched:
+        resume = (date.fromisoformat(query["dates"][-1]) + timedelta(days=1)).isoformat()
+        notes.append(f"only the first {searched} of the {requested} requested departure dates were searched "
+                     f"(limit {MAX_DATE_SPAN}); search again from {resume} for the rest.")
+    return "".join(f"\nNote: {note}" for note in notes)
+
+
+def format_offers(offers, query, total, sources):
+    """Numbered, agent-readable table of ranked offers, noting loosely read places and unsearched dates."""
+    if not offers:
+        return (f"No flights found from {query['origin']} to {query['destination']} on the requested dates."
+                + _notes(query))
+    dates = query["dates"][0] if len(query["dates"]) == 1 else f"{query['dates'][0]}..{query['dates'][-1]}"
+    lines = [f"Top {len(offers)} of {total} flights {query['origin']}→{query['destination']}, {dates} "
+             f"({', '.join(sorted(sources))}):"]
+    for i, offer in enumerate(offers, 1):
+        parts = [f"{i}. {offer.carrier} {offer.flight}",
+                 f"{offer.departure[:10]} {_clock(offer.departure)} → {_clock(offer.arrival)}",
+                 "nonstop" if offer.stops == 0 else f"{offer.stops} stop{'s' * (offer.stops > 1)}"]
+        if offer.duration_minutes is not None:
+            parts.append(f"{offer.duration_minutes // 60}h{offer.duration_minutes % 60:02d}m")
+        if offer.cabin:
+            parts.append(offer.cabin.replace("_", " ").title())
+        if offer.price is not None:
+            parts.append(f"{offer.price:.2f} {offer.currency}".strip())
+        if offer.return_departure:
+            parts.append(f"return {offer.return_departure[:10]} {_clock(offer.return_departure)}")
+        lines.append(" · ".join(parts))
+    return "\n".join(lines) + _notes(query)
+
+
+class FlightSearch:
+    """Runs one flight search across a date range against Amadeus, falling back to AviationStack.
+
+    ``amadeus_token``/``aamadeus_token`` return a bearer token and
+    ``invalidate_token`` drops it after a 401; leave ``amadeus_url`` unset to
+    search AviationStack only.
+    """
+
+    def __init__(self, amadeus_url=None, amadeus_token=None, aamadeus_token=None, invalidate_token=None,
+                 aviationstack_url=None, aviationstack_key=None, workers=FANOUT_WORKERS, top_k=TOP_K):
+        self.amadeus_url = amadeus_url
+        self.amadeus_token = amadeus_token
+        self.aamadeus_token = aamadeus_token
+        self.invalidate_token = invalidate_token
+        self.aviationstack_url = aviationstack_url
+        self.aviationstack_key = aviationstack_key
+        self.workers = workers
+        self.top_k = top_k
+
+    @property
+    def configured(self):
+        return bool(self.amadeus_url or (self.aviationstack_url and self.aviationstack_key))
+
+    def _amadeus_params(self, query, day):
+        params = {
+            "originLocationCode": query["origin"],
+            "destinationLocationCode": query["destination"],
+            "departureDate": day,
+            "adults": query["adults"],
+            "travelClass": query["cabin"],
+            "nonStop": "true" if query["nonstop"] else "false",
+            "currencyCode": "USD",
+            "max": self.top_k,
+        }
+        if query["return_date"]:
+            params["returnDate"] = query["return_date"]
+        return params
+
+    def _aviationstack_params(self, query, day, offset):
+        return {"access_key": self.aviationstack_key, "dep_iata": query["origin_airport"],
+                "arr_iata": query["destination_airport"],
+                "flight_date": day, "flight_status": "scheduled",
+                "limit": AVIATIONSTACK_PAGE_SIZE, "offset": offset}
+
+    @staticmethod
+    def _amadeus_offers(response, query):
+        if response.status_code != 200:
+            raise FlightSearchError(f"Amadeus flight offers failed ({response.status_code}): "
+                                    f"{body_text(response)[:200]}")
+        stream = ArrayStream(iter_body(response))
+        return _name_carriers([_amadeus_offer(offer, query["cabin"]) for offer in stream], stream.fields)
+
+    @staticmethod
+    async def _aamadeus_offers(response, query):
+        if response.status_code != 200:
+            raise FlightSearchError(f"Amadeus flight offers failed ({response.status_code}): "
+                                    f"{(await abody_text(response))[:200]}")
+        stream = ArrayStream(aiter_body(response))
+        return _name_carriers([_amadeus_offer(offer, query["cabin"]) async for offer in stream], stream.fields)
+
+    @staticmethod
+    def _aviationstack_page(response):
+        """(flights, more pages available) for one AviationStack page."""
+        if response.status_code != 200:
+            raise FlightSearchError(f"AviationStack failed ({response.status_code}): {body_text(response)[:200]}")
+        stream = ArrayStream(iter_body(response))
+        flights = [_aviationstack_flight(row) for row in stream]
+        return flights, _more_pages(stream.fields, len(flights))
+
+    @staticmethod
+    async def _aaviationstack_page(response):
+        if response.status_code != 200:
+            raise FlightSearchError(f"AviationStack failed ({response.status_code}): "
+                                    f"{(await abody_text(response))[:200]}")
+        stream = ArrayStream(aiter_body(response))
+        flights = [_aviationstack_flight(row) async for row in stream]
+        return flights, _more_pages(stream.fields, len(flights))
+
+    # --- Sync path ---------------------------------------------------------
+
+    def _search_amadeus(self, query, day):
+        client = get_provider_client()
+        params = self._amadeus_params(query, day)
+        response = client.get(self.amadeus_url, params=params, stream=True,
+                              headers={"Authorization": f"Bearer {self.amadeus_token()}"})
+        if response.status_code == 401 and self.invalidate_token:
+            response.close()
+            self.invalidate_token()
+            response = client.get(self.amadeus_url, params=params, stream=True,
+                                  headers={"Authorization": f"Bearer {self.amadeus_token()}"})
+        try:
+            return self._amadeus_offers(response, query)
+        finally:
+            response.close()
+
+    def _search_aviationstack(self, query, day):
+        client, flights, offset = get_provider_client(), [], 0
+        for _ in range(AVIATIONSTACK_MAX_PAGES):
+            response = client.get(self.aviationstack_url, params=self._aviationstack_params(query, day, offset),
+                                  stream=True)
+            try:
+                page, more = self._aviationstack_page(response)
+            finally:
+                response.close()
+            flights.extend(page)
+            offset += len(page)
+            if not more or len(flights) >= self.top_k:
+                break
+        return flights
+
+    def _search_day(self, query, day):
+        """(source, offers) for one departure date."""
+        if self.amadeus_url:
+            try:
+                return "Amadeus", self._search_amadeus(query, day)
+            except Exception:
+                if not (self.aviationstack_url and self.aviationstack_key):
+                    raise
+        return "AviationStack", self._search_aviationstack(query, day)
+
+    def search(self, query):
+        """Search every date in ``query`` concurrently; returns (ranked offers, total offers, sources)."""
+        days = query["dates"]
+        # Each worker runs in a copy of the caller's context so spans and metrics nest under the tool call
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(days)))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, self._search_day, query, day) for day in days]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+        return self._merge(outcomes)
+
+    # --- Async path --------------------------------------------------------
+
+    async def _asearch_amadeus(self, query, day):
+        client = get_provider_client()
+        params = self._amadeus_params(query, day)
+        response = await client.aget(self.amadeus_url, params=params, stream=True,
+                                     headers={"Authorization": f"Bearer {await self.aamadeus_token()}"})
+        if response.status_code == 401 and self.invalidate_token:
+            await aclose_response(response)
+            self.invalidate_token()
+            response = await client.aget(self.amadeus_url, params=params, stream=True,
+                                         headers={"Authorization": f"Bearer {await self.aamadeus_token()}"})
+        try:
+            return await self._aamadeus_offers(response, query)
+        finally:
+            await aclose_response(response)
+
+    async def _asearch_aviationstack(self, query, day):
+        client, flights, offset = get_provider_client(), [], 0
+        for _ in range(AVIATIONSTACK_MAX_PAGES):
+            response = await client.aget(self.aviationstack_url,
+                                         params=self._aviationstack_params(query, day, offset), stream=True)
+            try:
+                page, more = await self._aaviationstack_page(response)
+            finally:
+                await aclose_response(response)
+            flights.extend(page)
+            offset += len(page)
+            if not more or len(flights) >= self.top_k:
+                break
+        return flights
+
+    async def _asearch_day(self, query, day, semaphore):
+        async with semaphore:
+            if self.amadeus_url:
+                try:
+                    return "Amadeus", await self._asearch_amadeus(query, day)
+                except Exception:
+                    if not (self.aviationstack_url and self.aviationstack_key):
+                        raise
+            return "AviationStack", await self._asearch_aviationstack(query, day)
+
+    async def asearch(self, query):
+        """Async version of :meth:`search`."""
+        semaphore = asyncio.Semaphore(max(1, self.workers))
+        outcomes = await asyncio.gather(*(self._asearch_day(query, day, semaphore) for day in query["dates"]),
+                                        return_exceptions=True)
+        return self._merge(outcomes)
+
+    def _merge(self, outcomes):
+        offers, sources, errors = [], set(), []
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                errors.append(outcome)
+                continue
+            source, day_offers = outcome
+            sources.add(source)
+            offers.extend(day_offers)
+        if errors and not sources:
+            raise errors[0]
+        return top_offers(offers, self.top_k), len(offers), sources
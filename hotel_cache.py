@@ -0,0 +1,179 @@
+"""
+Hotel Offer Cache - TTL + LRU cache for hotel searches keyed by normalized parameters
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d.%m.%Y", "%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y")
+
+
+def normalize_date(value) -> str:
+    """Return the date as an ISO string (YYYY-MM-DD)."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()[:10]
+    text = str(value).strip().replace(",", "")
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value!r} (expected YYYY-MM-DD)")
+
+
+def normalize_hotel_search(city_code: str, check_in, check_out, adults=1) -> tuple:
+    """Canonical (city_code, check_in, check_out, adults) used as the cache key and request."""
+    return (str(city_code).strip().upper(), normalize_date(check_in), normalize_date(check_out), int(adults))
+
+
+class MemoryBackend:
+    """In-process LRU store holding (expires_at, value) pairs."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """On-disk LRU store that survives restarts. Values must be JSON serializable."""
+
+    def __init__(self, path="hotel_cache.sqlite3", max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class HotelOfferCache:
+    """Caches hotel search results for ``ttl`` seconds on a pluggable backend."""
+
+    def __init__(self, backend=None, ttl=900):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(city_code, check_in, check_out, adults=1, variant="") -> str:
+        """``variant`` separates results for the same stay ranked differently (e.g. another budget tier)."""
+        parts = normalize_hotel_search(city_code, check_in, check_out, adults) + ((variant,) if variant else ())
+        return "|".join(str(part) for part in parts)
+
+    def get(self, city_code, check_in, check_out, adults=1, variant=""):
+        value = self.backend.get(self.make_key(city_code, check_in, check_out, adults, variant))
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def set(self, city_code, check_in, check_out, adults, value, variant=""):
+        self.backend.set(self.make_key(city_code, check_in, check_out, adults, variant), value, self.ttl)
+
+    def invalidate(self, city_code, check_in, check_out, adults=1, variant=""):
+        self.backend.delete(self.make_key(city_code, check_in, check_out, adults, variant))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Return hit/miss counters, the hit ratio and the current entry count."""
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "entries": len(self.backend),
+        }
+
+
+def hotel_cache_from_env() -> HotelOfferCache:
+    """Build the cache configured by HOTEL_CACHE_* environment variables."""
+    max_entries = int(os.getenv("HOTEL_CACHE_MAX_ENTRIES", "1024"))
+    if os.getenv("HOTEL_CACHE_BACKEND", "memory").lower() == "sqlite":
+        backend = SQLiteBackend(os.getenv("HOTEL_CACHE_PATH", "hotel_cache.sqlite3"), max_entries)
+    else:
+        backend = MemoryBackend(max_entries)
+    return HotelOfferCache(backend, ttl=float(os.getenv("HOTEL_CACHE_TTL", "900")))
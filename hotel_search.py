@@ -0,0 +1,231 @@
+"""
+Hotel Search - compact records parsed from a streamed hotel-offers body, ranked top-k
+
+Amadeus hotel-offers payloads carry every room offer with policies, room
+descriptions and media for each hotel, so a large city runs to megabytes. The
+body is read with json_stream.ArrayStream one hotel at a time and each hotel is
+reduced to a HotelOffer for its cheapest room offer as soon as it is decoded.
+
+Every hotel is scored by nightly price, star rating and fit with the
+traveller's budget tier (lower is better) and pushed through a bounded heap, so
+ranking n hotels costs O(n log k) time and O(k) memory. Hotels below the
+requested minimum rating rank after all that meet it.
+
+Multi-city trips are searched as a batch of legs (city, check_in, check_out,
+adults) on a bounded worker pool, and answered with one table per leg.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from json_stream import ArrayStream
+from slot_extractor import BUDGET_TIERS
+
+TOP_K = int(os.getenv("HOTEL_TOP_K", "5"))
+BATCH_WORKERS = int(os.getenv("HOTEL_BATCH_WORKERS", "4"))
+MAX_LEGS = int(os.getenv("HOTEL_BATCH_MAX_LEGS", "8"))
+
+# Nightly price (USD) and star range each budget tier expects
+TIER_PRICE_BANDS = {"budget": (0, 120), "mid-range": (90, 250), "luxury": (220, math.inf)}
+TIER_RATINGS = {"budget": (1, 3), "mid-range": (3, 4), "luxury": (4, 5)}
+# One star is worth PRICE_SCALE * RATING_WEIGHT per night; leaving the tier's band by
+# 100% of its edge costs TIER_WEIGHT, as does each star outside the tier's range
+PRICE_SCALE = 100.0
+RATING_WEIGHT = 0.5
+TIER_WEIGHT = 2.0
+UNKNOWN_RATING = 2.5
+
+
+class HotelOffer:
+    """The fields of one hotel (and its cheapest offer) the agents need."""
+
+    __slots__ = ("hotel_id", "name", "rating", "price", "currency", "offer_id")
+
+    def __init__(self, hotel_id, name, rating, price, currency, offer_id):
+        self.hotel_id = hotel_id
+        self.name = name
+        self.rating = rating
+        self.price = price
+        self.currency = currency
+        self.offer_id = offer_id
+
+    def __repr__(self):
+        return f"HotelOffer({self.hotel_id}, {self.name!r}, {self.price:.2f} {self.currency})"
+
+
+def _price(offer):
+    try:
+        return float((offer.get("price") or {}).get("total"))
+    except (TypeError, ValueError):
+        return None
+
+
+def hotel_offer(item):
+    """HotelOffer for the cheapest priced offer of one ``data`` element, or None if there is none."""
+    if not isinstance(item, dict) or item.get("available") is False:
+        return None
+    hotel = item.get("hotel") or {}
+    priced = [(price, offer) for offer in item.get("offers") or [] if isinstance(offer, dict)
+              for price in [_price(offer)] if price is not None]
+    if not hotel.get("name") or not priced:
+        return None
+    total, offer = min(priced, key=lambda pair: pair[0])
+    try:
+        rating = int(hotel.get("rating"))
+    except (TypeError, ValueError):
+        rating = None
+    return HotelOffer(hotel.get("hotelId", ""), hotel["name"], rating, total,
+                      offer["price"].get("currency", ""), offer.get("id", ""))
+
+
+def normalize_budget(budget) -> str:
+    """Budget tier ("budget", "mid-range" or "luxury") for any wording slot_extractor knows; "" if none."""
+    return BUDGET_TIERS.get(str(budget or "").strip().lower(), "")
+
+
+def stay_nights(check_in, check_out) -> int:
+    return max(1, (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days)
+
+
+def _outside(value, low, high):
+    """Relative distance of ``value`` outside [low, high] (0 inside)."""
+    if value < low:
+        return (low - value) / low if low else 0.0
+    if value > high:
+        return (value - high) / high
+    return 0.0
+
+
+def score(hotel, nights, budget=""):
+    """Lower is better: nightly price, less a bonus per star, plus a penalty for missing the budget tier."""
+    nightly = hotel.price / nights
+    rating = hotel.rating if hotel.rating is not None else UNKNOWN_RATING
+    value = nightly / PRICE_SCALE - RATING_WEIGHT * rating
+    if budget in TIER_PRICE_BANDS:
+        low, high = TIER_RATINGS[budget]
+        value += TIER_WEIGHT * (_outside(nightly, *TIER_PRICE_BANDS[budget]) + max(0, low - rating, rating - high))
+    return value
+
+
+class HotelRanking:
+    """Streaming top-k: push() every hotel, then best() returns the ``k`` best in rank order."""
+
+    def __init__(self, nights, budget="", min_rating=0, k=TOP_K):
+        self.nights = nights
+        self.budget = normalize_budget(budget)
+        self.min_rating = int(min_rating or 0)
+        self.k = k
+        self.seen = 0
+        self._heap = []
+        self._order = itertools.count()
+
+    def rank_key(self, hotel):
+        below = (hotel.rating or 0) < self.min_rating
+        return (int(below), score(hotel, self.nights, self.budget), hotel.price)
+
+    def push(self, hotel):
+        self.seen += 1
+        # Max-heap of the k best so far (keys negated); on ties the earlier hotel stays, as in heapq.nsmallest
+        entry = (tuple(-part for part in self.rank_key(hotel)), -next(self._order), hotel)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def best(self):
+        return [hotel for _, _, hotel in sorted(self._heap, reverse=True)]
+
+
+def rank_hotel_offers(chunks, ranking):
+    """Push every usable hotel in the body chunks through ``ranking``; returns ranking.best()."""
+    for item in ArrayStream(chunks):
+        hotel = hotel_offer(item)
+        if hotel is not None:
+            ranking.push(hotel)
+    return ranking.best()
+
+
+async def arank_hotel_offers(chunks, ranking):
+    """Async version of rank_hotel_offers for an async iterable of chunks."""
+    async for item in ArrayStream(chunks):
+        hotel = hotel_offer(item)
+        if hotel is not None:
+            ranking.push(hotel)
+    return ranking.best()
+
+
+def _stars(rating):
+    return f"{rating}★" if rating else "unrated"
+
+
+def format_hotels(hotels, search, ranking):
+    """Numbered, agent-readable table of ranked hotels for ``search`` (city, check_in, check_out, adults)."""
+    city, check_in, check_out, adults = search
+    if not hotels:
+        return f"No hotels found in {city} for {check_in}..{check_out}."
+    preferences = [f"{ranking.nights} night{'s' * (ranking.nights > 1)}", f"{adults} adult{'s' * (adults > 1)}"]
+    if ranking.budget:
+        preferences.append(ranking.budget)
+    if ranking.min_rating:
+        preferences.append(f"{ranking.min_rating}★+")
+    lines = [f"Top {len(hotels)} of {ranking.seen} hotels in {city}, {check_in}..{check_out} "
+             f"({', '.join(preferences)}):"]
+    for i, hotel in enumerate(hotels, 1):
+        total = f"{hotel.price:.2f} {hotel.currency}".strip()
+        lines.append(f"{i}. {hotel.name} · {_stars(hotel.rating)} · {total} total · "
+                     f"{hotel.price / ranking.nights:.2f}/night")
+    return "\n".join(lines)
+
+
+def normalize_hotel_legs(legs) -> list:
+    """[(city, check_in, check_out, adults)] from dicts or (city, check_in, check_out[, adults]) sequences."""
+    if not legs:
+        raise ValueError("No legs given: pass at least one {city, check_in, check_out, adults}")
+    if len(legs) > MAX_LEGS:
+        raise ValueError(f"Too many legs: {len(legs)} (at most {MAX_LEGS} per search)")
+    normalized = []
+    for i, leg in enumerate(legs, 1):
+        if isinstance(leg, dict):
+            city = leg.get("city") or leg.get("city_code") or leg.get("destination")
+            check_in, check_out, adults = leg.get("check_in"), leg.get("check_out"), leg.get("adults") or 1
+        elif isinstance(leg, (list, tuple)) and len(leg) in (3, 4):
+            city, check_in, check_out, adults = (*leg, 1)[:4]
+        else:
+            raise ValueError(f"Leg {i} must be {{city, check_in, check_out, adults}}, got {leg!r}")
+        if not city or not check_in or not check_out:
+            raise ValueError(f"Leg {i} needs a city, check_in and check_out, got {leg!r}")
+        normalized.append((str(city), str(check_in), str(check_out), int(adults)))
+    return normalized
+
+
+def search_legs(legs, search, workers=BATCH_WORKERS):
+    """Run ``search(city, check_in, check_out, adults)`` for every leg on a bounded pool; results in leg order."""
+    # Each worker runs in a copy of the caller's context so spans and metrics nest under the tool call
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(legs)))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, search, *leg) for leg in legs]
+        return [future.result() for future in futures]
+
+
+async def asearch_legs(legs, asearch, workers=BATCH_WORKERS):
+    """Async version of search_legs: at most ``workers`` legs in flight at once."""
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async def run(leg):
+        async with semaphore:
+            return await asearch(*leg)
+
+    return await asyncio.gather(*(run(leg) for leg in legs))
+
+
+def format_legs(legs, results):
+    """One ranked table per leg, in itinerary order."""
+    sections = [f"Hotels for {len(legs)} leg{'s' * (len(legs) > 1)}:"]
+    for i, ((city, check_in, check_out, _), result) in enumerate(zip(legs, results), 1):
+        sections.append(f"Leg {i} ({city}, {check_in}..{check_out}):\n{result}")
+    return "\n\n".join(sections)
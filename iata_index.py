@@ -0,0 +1,314 @@
+"""
+IATA Index - local city/airport code lookup with alias and typo-tolerant matching
+
+    resolve_city_code("Bali")         -> "DPS"   (hotel searches)
+    resolve_airport_code("New York")  -> "JFK"   (schedule APIs that need an airport)
+    get_iata_index().lookup("Pariss") -> Place(PAR, Paris)
+    resolution_note("Pariss")         -> "interpreted 'Pariss' as Paris, FR (PAR)"
+
+Places are read once from IATA_INDEX_FILE (iata_codes.csv next to this module by
+default) into dictionaries: exact codes, names and aliases are one hash lookup,
+and misspellings are found through a symmetric-delete table (every string one or
+two deletions away from a known name), so a lookup costs microseconds and never
+touches the network. Names shorter than MIN_FUZZY_LENGTH must match exactly (one
+edit turns "Nara" into "Naha"), and "City, Qualifier" only names the city
+outright when the qualifier is its country. Anything else that was matched
+loosely is reported by resolution_note() so tools can say how they read it.
+Three-letter codes written in capitals that the index does not list pass
+through unchanged; other unknown names raise ValueError with the closest
+suggestions.
+"""
+
+import csv
+import difflib
+import os
+import re
+import threading
+import unicodedata
+
+IATA_INDEX_FILE = os.getenv("IATA_INDEX_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            "iata_codes.csv"))
+NOISE_WORDS = {"airport", "international", "intl", "city", "the", "metro", "area"}
+# Shortest name matched with a typo; a known name one character shorter can still be its match
+MIN_FUZZY_LENGTH = 6
+
+# Country names accepted as the qualifier in "City, Country", by the index's ISO country codes
+COUNTRY_NAMES = {
+    "AE": ("united arab emirates", "uae"), "AR": ("argentina",), "AT": ("austria",),
+    "AU": ("australia",), "BB": ("barbados",), "BE": ("belgium",), "BR": ("brazil", "brasil"),
+    "BS": ("bahamas", "the bahamas"), "CA": ("canada",), "CH": ("switzerland",), "CL": ("chile",),
+    "CN": ("china",), "CO": ("colombia",), "CR": ("costa rica",), "CU": ("cuba",),
+    "CZ": ("czech republic", "czechia"), "DE": ("germany",), "DK": ("denmark",),
+    "DO": ("dominican republic",), "EC": ("ecuador",), "EG": ("egypt",), "ES": ("spain",),
+    "FI": ("finland",), "FJ": ("fiji",), "FR": ("france",), "GB": ("united kingdom", "uk", "england",
+    "scotland", "wales", "great britain", "britain"), "GR": ("greece",), "HK": ("hong kong",),
+    "HR": ("croatia",), "HU": ("hungary",), "ID": ("indonesia",), "IE": ("ireland",), "IL": ("israel",),
+    "IN": ("india",), "IS": ("iceland",), "IT": ("italy",), "JM": ("jamaica",), "JO": ("jordan",),
+    "JP": ("japan",), "KE": ("kenya",), "KH": ("cambodia",), "KR": ("south korea", "korea"),
+    "LK": ("sri lanka",), "MA": ("morocco",), "MO": ("macau", "macao"), "MV": ("maldives",),
+    "MX": ("mexico",), "MY": ("malaysia",), "NL": ("netherlands", "the netherlands", "holland"),
+    "NO": ("norway",), "NP": ("nepal",), "NZ": ("new zealand",), "PA": ("panama",), "PE": ("peru",),
+    "PF": ("french polynesia", "tahiti"), "PH": ("philippines", "the philippines"), "PL": ("poland",),
+    "PR": ("puerto rico",), "PT": ("portugal",), "QA": ("qatar",), "RU": ("russia",), "SE": ("sweden",),
+    "SG": ("singapore",), "TH": ("thailand",), "TR": ("turkey", "turkiye"), "TW": ("taiwan",),
+    "TZ": ("tanzania",), "US": ("united states", "usa", "us", "america", "united states of america"),
+    "VN": ("vietnam", "viet nam"), "ZA": ("south africa",),
+}
+
+
+class Place:
+    """One city or airport row of the index."""
+
+    __slots__ = ("code", "type", "name", "country", "city_code", "main_airport", "aliases")
+
+    def __init__(self, code, type, name, country, city_code="", main_airport="", aliases=()):
+        self.code = code
+        self.type = type
+        self.name = name
+        self.country = country
+        self.city_code = city_code or (code if type == "city" else "")
+        self.main_airport = main_airport or (code if type == "airport" else "")
+        self.aliases = tuple(aliases)
+
+    @property
+    def city(self):
+        """City code for hotel searches (the airport's metropolitan code for airports)."""
+        return self.city_code or self.code
+
+    @property
+    def airport(self):
+        """Airport code for schedule searches (the city's main airport for cities)."""
+        return self.main_airport or self.code
+
+    def __repr__(self):
+        return f"Place({self.code}, {self.name}, {self.country})"
+
+
+def normalize_name(text) -> str:
+    """Lowercase ASCII words: "São Paulo, Brazil" -> "sao paulo brazil"."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def _max_distance(key):
+    # One typo per word-sized name; two only for long names, so "Atlantis" does not become Atlanta
+    return 1 if len(key) <= 8 else 2
+
+
+def _deletes(key, distance):
+    """Every string obtained by deleting up to ``distance`` characters from ``key``."""
+    variants, frontier = {key}, {key}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier if len(word) > 1 for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[len(b)]
+
+
+class IataIndex:
+    """In-memory code, name/alias and misspelling tables over a list of Places.
+
+    Earlier rows win ties, so cities listed first are preferred over airports
+    and over later cities with a similar name.
+    """
+
+    def __init__(self, places):
+        self.places = list(places)
+        self._by_code = {}
+        self._by_name = {}
+        self._rank = {}
+        self._fuzzy = {}
+        for place in self.places:
+            self._by_code.setdefault(place.code, place)
+        for place in self.places:
+            for alias in (place.name, *place.aliases):
+                self._add_name(normalize_name(alias), place)
+
+    def _add_name(self, key, place):
+        if not key or key in self._by_name:
+            return
+        self._by_name[key] = place
+        self._rank[key] = len(self._rank)
+        if len(key) >= MIN_FUZZY_LENGTH - 1:
+            for variant in _deletes(key, _max_distance(key)):
+                self._fuzzy.setdefault(variant, []).append(key)
+
+    def __len__(self):
+        return len(self.places)
+
+    def _candidates(self, key):
+        """Known names within edit distance of ``key``, as [(distance, rank, name)] best first."""
+        if len(key) < MIN_FUZZY_LENGTH:
+            return []
+        limit = _max_distance(key)
+        seen = set()
+        for variant in _deletes(key, limit):
+            seen.update(self._fuzzy.get(variant, ()))
+        scored = []
+        for name in seen:
+            distance = edit_distance(key, name)
+            if distance <= min(limit, _max_distance(name)):
+                scored.append((distance, self._rank[name], name))
+        return sorted(scored)
+
+    def _keys(self, text):
+        """(key, qualifier) forms of ``text`` to try in order, loosest last."""
+        key = normalize_name(text)
+        yield key, ""
+        stripped = " ".join(word for word in key.split() if word not in NOISE_WORDS)
+        if stripped != key:
+            yield stripped, ""
+        if "," in str(text):
+            name, qualifier = str(text).split(",", 1)
+            yield normalize_name(name), normalize_name(qualifier)
+
+    @staticmethod
+    def _in_country(place, qualifier):
+        return qualifier == place.country.lower() or qualifier in COUNTRY_NAMES.get(place.country, ())
+
+    def match(self, text):
+        """(Place, interpreted) for ``text``, or (None, False).
+
+        ``interpreted`` is True when ``text`` did not name the place exactly: a
+        misspelling, or a "City, Qualifier" whose qualifier is not the city's country
+        ("Paris, Texas" is only read as Paris, FR).
+        """
+        raw = str(text or "").strip()
+        code = raw.upper() if len(raw) == 3 and raw.isalpha() else ""
+        # Codes come first only when written as codes: "Goa" is a name, "GOA" is Genoa
+        if code and raw == code and code in self._by_code:
+            return self._by_code[code], False
+        keys = [(key, qualifier) for key, qualifier in self._keys(raw) if key]
+        for key, qualifier in keys:
+            place = self._by_name.get(key)
+            if place is not None:
+                return place, bool(qualifier) and not self._in_country(place, qualifier)
+        if code in self._by_code:
+            return self._by_code[code], False
+        for key, _ in keys:
+            candidates = self._candidates(key)
+            if candidates:
+                return self._by_name[candidates[0][2]], True
+        return None, False
+
+    def lookup(self, text):
+        """The Place ``text`` refers to (code, name, alias or a close misspelling), or None."""
+        return self.match(text)[0]
+
+    def code(self, code):
+        """The Place with this exact IATA code, or None."""
+        return self._by_code.get(str(code).strip().upper())
+
+    def suggest(self, text, limit=3):
+        """Up to ``limit`` places whose names resemble ``text`` (for error messages)."""
+        key = normalize_name(text)
+        names = [name for _, _, name in self._candidates(key)]
+        if len(names) < limit:
+            names += difflib.get_close_matches(key, list(self._by_name), n=limit, cutoff=0.6)
+        places = []
+        for name in names:
+            place = self._by_name[name]
+            if place not in places:
+                places.append(place)
+        return places[:limit]
+
+    def _resolve(self, text):
+        """(Place or None for an unlisted code, note saying how ``text`` was read or "")."""
+        place, interpreted = self.match(text)
+        raw = str(text or "").strip()
+        if place is not None:
+            return place, f"interpreted {raw!r} as {place.name}, {place.country} ({place.code})" if interpreted else ""
+        if len(raw) == 3 and raw.isalpha() and raw.isupper():
+            # An IATA code this compact index does not list; let the provider judge it
+            return None, f"{raw} is not in the local IATA index and was searched as given"
+        hints = ", ".join(f"{p.name} ({p.code})" for p in self.suggest(raw))
+        raise ValueError(f"Unknown city or airport: {raw!r}" + (f". Did you mean {hints}?" if hints else ""))
+
+    def resolution_note(self, text) -> str:
+        """How ``text`` was read when it did not name a listed place exactly; "" when it did."""
+        return self._resolve(text)[1]
+
+    def city_code(self, text) -> str:
+        """IATA city code for a city/airport name, alias or code."""
+        place = self._resolve(text)[0]
+        return place.city if place else str(text).strip().upper()
+
+    def airport_code(self, text) -> str:
+        """IATA airport code for a city (its main airport) or airport name, alias or code."""
+        place = self._resolve(text)[0]
+        return place.airport if place else str(text).strip().upper()
+
+    def location_code(self, text) -> str:
+        """The code exactly as the user meant it: an airport when they named one, else the city."""
+        place = self._resolve(text)[0]
+        return place.code if place else str(text).strip().upper()
+
+
+def load_index(path=IATA_INDEX_FILE) -> IataIndex:
+    """Read a CSV with columns code,type,name,country,city_code,main_airport,aliases ("|"-separated)."""
+    places = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            aliases = [alias for alias in (row.get("aliases") or "").split("|") if alias.strip()]
+            places.append(Place(row["code"].strip().upper(), row["type"].strip(), row["name"].strip(),
+                                row["country"].strip(), (row.get("city_code") or "").strip().upper(),
+                                (row.get("main_airport") or "").strip().upper(), aliases))
+    return IataIndex(places)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_iata_index() -> IataIndex:
+    """Process-wide index, loaded on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_index()
+    return _index
+
+
+def resolve_city_code(text) -> str:
+    return get_iata_index().city_code(text)
+
+
+def resolve_airport_code(text) -> str:
+    return get_iata_index().airport_code(text)
+
+
+def resolve_location_code(text) -> str:
+    return get_iata_index().location_code(text)
+
+
+def resolution_note(text) -> str:
+    return get_iata_index().resolution_note(text)
+
+
+if __name__ == "__main__":
+    import sys
+    import timeit
+
+    index = get_iata_index()
+    for query in sys.argv[1:] or ["Bali", "New York", "Heathrow", "Pariss", "Barcelonna", "São Paulo, Brazil",
+                                  "Paris, Texas", "Nara"]:
+        place, interpreted = index.match(query)
+        seconds = timeit.timeit(lambda: index.lookup(query), number=2000) / 2000
+        found = f"{place.code} city={place.city} airport={place.airport} ({place.name})" if place else "not found"
+        if interpreted:
+            found += " [interpreted]"
+        print(f"🔎 {query!r:24} -> {found}  [{seconds * 1e6:.1f} µs]")
@@ -0,0 +1,277 @@
+"""
+Itinerary Cache - serves repeat itinerary requests without another LLM generation
+
+Entries are keyed on the (destination, days, budget) slots of a complete plan
+request plus its remaining details ("solo", "I love street art"). A request
+with the same slots whose details are worded differently is matched by
+embedding similarity of the details, above a configurable threshold; an
+itinerary is never reused for another destination, trip length or budget tier,
+and a generic one never answers a request with details.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from slot_extractor import extract_slots, is_plan_request, request_details
+
+
+def _is_user(message) -> bool:
+    if isinstance(message, dict):
+        return message.get("role") == "user"
+    return getattr(message, "type", "") == "human"
+
+
+def _name(message):
+    return message.get("name") if isinstance(message, dict) else getattr(message, "name", None)
+
+
+def _text(message) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+class HashingEmbedder:
+    """Dependency-free embedding: hashed character trigrams, L2-normalized."""
+
+    def __init__(self, dimensions=256):
+        self.dimensions = dimensions
+
+    def __call__(self, text: str) -> list:
+        vector = [0.0] * self.dimensions
+        padded = f"  {' '.join(text.lower().split())} "
+        for i in range(len(padded) - 2):
+            digest = hashlib.blake2b(padded[i:i + 3].encode(), digest_size=4).digest()
+            vector[int.from_bytes(digest, "little") % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ItineraryCache:
+    """Itinerary store keyed on slots and request details, with a similarity fallback on the details.
+
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(self, embed=None, similarity_threshold=0.9, ttl=86400.0, max_entries=2048):
+        self.embed = embed or HashingEmbedder()
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "similar_hits": 0, "misses": 0}
+
+    @staticmethod
+    def slot_key(slots):
+        if not slots or not all(slots.get(k) for k in ("destination", "days", "budget")):
+            return None
+        return (slots["destination"].strip().lower(), int(slots["days"]), slots["budget"].lower())
+
+    def _key(self, query, slots):
+        """(destination, days, budget, details) for ``query``, or None when its slots are incomplete."""
+        slots = slots if slots is not None else extract_slots(query)
+        key = self.slot_key(slots)
+        return key + (request_details(query),) if key else None
+
+    def _similar(self, key, vector):
+        """Key of the entry with the same slots whose details are most similar to ``vector``, or None."""
+        best, best_score = None, self.similarity_threshold
+        now = time.time()
+        for other, entry in self._entries.items():
+            # Never match across a different destination, trip length or budget tier,
+            # nor answer a request with details from a generic itinerary (which has no vector)
+            if other[:3] != key[:3] or entry["vector"] is None or entry["expires_at"] <= now:
+                continue
+            score = _cosine(vector, entry["vector"])
+            if score >= best_score:
+                best, best_score = other, score
+        return best
+
+    def lookup(self, query: str, slots=None):
+        """Return a cached itinerary for the request, or None."""
+        key = self._key(query, slots)
+        with self._lock:
+            entry = self._entries.get(key) if key else None
+            if entry and entry["expires_at"] > time.time():
+                self._entries.move_to_end(key)
+                self._stats["exact_hits"] += 1
+                return entry["itinerary"]
+            if not key or not key[3]:
+                self._stats["misses"] += 1
+                return None
+
+        vector = self.embed(key[3])
+        with self._lock:
+            similar = self._similar(key, vector)
+            if similar is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(similar)
+            self._stats["similar_hits"] += 1
+            return self._entries[similar]["itinerary"]
+
+    def store(self, query: str, itinerary: str, slots=None):
+        """Cache a generated itinerary under its slots and details; requests with incomplete slots are not cached."""
+        key = self._key(query, slots)
+        if not itinerary or key is None:
+            return
+        entry = {
+            "query": query,
+            # Stored normalized, like warm() entries, so invalidate() compares like with like
+            "slots": {"destination": key[0], "days": key[1], "budget": key[2]},
+            "vector": self.embed(key[3]) if key[3] else None,
+            "itinerary": itinerary,
+            "expires_at": time.time() + self.ttl,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def warm(self, records):
+        """Preload precomputed itineraries, e.g. batch_itineraries.py output records.
+
+        Each record needs destination, days, budget and itinerary; they are
+        stored as the generic (detail-free) itinerary for those slots.
+        """
+        count = 0
+        for record in records:
+            slots = {"destination": record.get("destination"), "days": record.get("days"),
+                     "budget": record.get("budget")}
+            key = self.slot_key(slots)
+            if key is None or not record.get("itinerary"):
+                continue
+            slots = {"destination": key[0], "days": key[1], "budget": key[2]}
+            key += ("",)
+            entry = {
+                "query": f"Plan a {key[1]}-day {key[2]} trip to {record['destination']}",
+                "slots": slots,
+                "vector": None,
+                "itinerary": record["itinerary"],
+                "expires_at": time.time() + self.ttl,
+            }
+            with self._lock:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            count += 1
+        return count
+
+    def invalidate(self, destination=None, days=None, budget=None):
+        """Remove entries matching every given slot (case-insensitively); with no arguments, clear the cache."""
+        with self._lock:
+            for key in list(self._entries):
+                slots = self._entries[key]["slots"]
+                if destination is not None and \
+                        str(slots.get("destination") or "").strip().lower() != destination.strip().lower():
+                    continue
+                if days is not None and slots.get("days") != int(days):
+                    continue
+                if budget is not None and str(slots.get("budget") or "").lower() != budget.strip().lower():
+                    continue
+                del self._entries[key]
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats["exact_hits"] + stats["similar_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["exact_hits"] + stats["similar_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+class CachedItineraryAgent:
+    """Puts an ItineraryCache in front of the itinerary agent.
+
+    Exposes the same ``name``/``invoke``/``ainvoke`` surface as the wrapped
+    agent, so it can be registered with the supervisor in its place. Only a
+    complete plan request opening the thread is served from (and stored in)
+    the cache; follow-ups such as "make day 2 more relaxed" always reach the
+    agent.
+    """
+
+    def __init__(self, agent, cache):
+        self.agent = agent
+        self.cache = cache
+        self.name = agent.name
+
+    def _request(self, messages):
+        """(query, slots) when the request may use the cache, else None."""
+        user_text = [_text(m) for m in messages if _is_user(m)]
+        if not user_text or not is_plan_request(user_text[-1]):
+            return None
+        if any(not _is_user(m) and _name(m) == self.name and _text(m) for m in messages):
+            return None  # the thread already has an itinerary; this is a revision of it
+        return user_text[-1], extract_slots(user_text[-1])
+
+    def _hit(self, state, itinerary):
+        from langchain_core.messages import AIMessage
+        return {"messages": list(state["messages"]) + [AIMessage(content=itinerary, name=self.name)]}
+
+    def invoke(self, state, config=None, **kwargs):
+        request = self._request(state["messages"])
+        if request is None:
+            return self.agent.invoke(state, config, **kwargs)
+        query, slots = request
+        itinerary = self.cache.lookup(query, slots)
+        if itinerary is not None:
+            return self._hit(state, itinerary)
+        result = self.agent.invoke(state, config, **kwargs)
+        self.cache.store(query, _text(result["messages"][-1]), slots)
+        return result
+
+    async def ainvoke(self, state, config=None, **kwargs):
+        request = self._request(state["messages"])
+        if request is None:
+            return await self.agent.ainvoke(state, config, **kwargs)
+        query, slots = request
+        itinerary = self.cache.lookup(query, slots)
+        if itinerary is not None:
+            return self._hit(state, itinerary)
+        result = await self.agent.ainvoke(state, config, **kwargs)
+        self.cache.store(query, _text(result["messages"][-1]), slots)
+        return result
+
+
+def itinerary_cache_from_env() -> ItineraryCache:
+    """Build the cache configured by ITINERARY_CACHE_* environment variables."""
+    embed = None
+    if os.getenv("ITINERARY_CACHE_EMBEDDINGS", "hashing").lower() == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        embed = OpenAIEmbeddings(model=os.getenv("ITINERARY_CACHE_EMBEDDING_MODEL", "text-embedding-3-small")).embed_query
+    cache = ItineraryCache(
+        embed=embed,
+        similarity_threshold=float(os.getenv("ITINERARY_CACHE_THRESHOLD", "0.9")),
+        ttl=float(os.getenv("ITINERARY_CACHE_TTL", "86400")),
+        max_entries=int(os.getenv("ITINERARY_CACHE_MAX_ENTRIES", "2048")),
+    )
+    # Precomputed itineraries (JSONL written by batch_itineraries.py)
+    warm_file = os.getenv("ITINERARY_CACHE_WARM_FILE")
+    if warm_file and os.path.exists(warm_file):
+        with open(warm_file, encoding="utf-8") as f:
+            records = []
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # blank or partially written line
+                if record.get("status") == "ok":
+                    records.append(record)
+        cache.warm(records)
+    return cache
@@ -0,0 +1,158 @@
+"""
+JSON Stream - incremental parsing of large provider payloads
+
+    stream = ArrayStream(iter_body(response), key="data")
+    for item in stream:          # or: async for item in ArrayStream(aiter_body(response))
+        ...
+    stream.fields                # the other top-level values read so far
+
+Provider payloads are a top-level object holding one large array ("data") next
+to small metadata ("meta", "pagination", "dictionaries"). ArrayParser is fed
+the body chunk by chunk, decodes complete values with
+json.JSONDecoder.raw_decode and drops the text it has consumed, so memory stays
+at about one chunk plus one element however large the payload is. Callers may
+stop iterating at any point; nothing after that is read.
+"""
+
+import codecs
+import json
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+_START, _KEY, _COLON, _VALUE, _ARRAY, _DONE = range(6)
+
+
+class _Incomplete(Exception):
+    """The buffer ends inside a value; wait for the next chunk."""
+
+
+class ArrayParser:
+    """Push parser for ``{..., key: [elements], ...}``: feed() returns the elements completed so far."""
+
+    def __init__(self, key="data"):
+        self.key = key
+        self.fields = {}
+        self.items = 0
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._field = None
+        self._final = False
+
+    @property
+    def done(self):
+        return self._state == _DONE
+
+    def feed(self, chunk):
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = self._utf8.decode(chunk)
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return self._parse()
+
+    def close(self):
+        """Parse whatever is buffered as the end of input; raises ValueError if the payload is truncated."""
+        self._final = True
+        items = self.feed(self._utf8.decode(b"", final=True))
+        if self._state != _DONE:
+            raise ValueError("Malformed JSON: payload ended before the top-level object closed")
+        return items
+
+    def _decode(self):
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._final:
+                raise
+            raise _Incomplete
+        # A number is only complete once a delimiter follows: "2" may be the start of "2.5"
+        if isinstance(value, (int, float)) and not self._final and \
+                (end == len(self._buffer) or self._buffer[end] not in _DELIMITERS):
+            raise _Incomplete
+        self._pos = end
+        return value
+
+    def _parse(self):
+        items = []
+        buffer = self._buffer
+        while self._state != _DONE:
+            while self._pos < len(buffer) and buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos == len(buffer):
+                break
+            char = buffer[self._pos]
+            try:
+                if self._state == _START:
+                    if char != "{":
+                        raise ValueError(f"Malformed JSON: expected an object, got {char!r}")
+                    self._pos += 1
+                    self._state = _KEY
+                elif self._state == _KEY:
+                    if char == "}":
+                        self._pos += 1
+                        self._state = _DONE
+                    elif char == ",":
+                        self._pos += 1
+                    elif char == '"':
+                        self._field = self._decode()
+                        self._state = _COLON
+                    else:
+                        raise ValueError(f"Malformed JSON: expected a key, got {char!r}")
+                elif self._state == _COLON:
+                    if char != ":":
+                        raise ValueError(f"Malformed JSON: expected ':', got {char!r}")
+                    self._pos += 1
+                    self._state = _VALUE
+                elif self._state == _VALUE:
+                    if self._field == self.key and char == "[":
+                        self._pos += 1
+                        self._state = _ARRAY
+                    else:
+                        self.fields[self._field] = self._decode()
+                        self._state = _KEY
+                elif char == "]":
+                    self._pos += 1
+                    self._state = _KEY
+                elif char == ",":
+                    self._pos += 1
+                else:
+                    items.append(self._decode())
+                    self.items += 1
+            except _Incomplete:
+                break
+        return items
+
+
+class ArrayStream:
+    """Iterate (sync or async) the elements of array ``key`` from an iterable of byte/str chunks."""
+
+    def __init__(self, chunks, key="data"):
+        self._chunks = chunks
+        self._parser = ArrayParser(key)
+
+    @property
+    def fields(self):
+        return self._parser.fields
+
+    @property
+    def items(self):
+        return self._parser.items
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from self._parser.feed(chunk)
+            if self._parser.done:
+                return
+        yield from self._parser.close()
+
+    async def __aiter__(self):
+        async for chunk in self._chunks:
+            for item in self._parser.feed(chunk):
+                yield item
+            if self._parser.done:
+                return
+        for item in self._parser.close():
+            yield item
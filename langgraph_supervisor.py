@@ -1,58 +1,266 @@
 from langgraph.prebuilt import create_react_agent
-from langgraph.graph import StateGraph, END
-from typing import List, Dict, Any
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import REMOVE_ALL_MESSAGES, add_messages
+from langgraph.types import Send
+from langchain_core.messages import AIMessage, RemoveMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+from typing import Annotated, Callable, List, Dict, Any, Optional, TypedDict
+
+from llm_scheduler import llm_priority
+from metrics import HANDOFFS, NODE_SECONDS, timed
+from tracing import current_span, span
+
+
+def _merge_outputs(left: Optional[Dict[str, str]], right: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Reducer for parallel agent results; writing None clears them."""
+    if right is None:
+        return {}
+    return {**(left or {}), **right}
+
+
+class SupervisorState(TypedDict, total=False):
+    messages: Annotated[list, add_messages]
+    # Agents the supervisor handed off to that have not run yet this turn
+    next_agents: List[str]
+    # Results of agents dispatched in a fan-out, keyed by agent name
+    agent_outputs: Annotated[Dict[str, str], _merge_outputs]
+    # Rolling summary and slot state kept by the history compactor
+    summary: str
+    slots: Dict[str, Any]
+
+
+HANDOFF_PREFIX = "transfer_to_"
+
+
+def create_handoff_tool(agent_name: str) -> StructuredTool:
+    """Tool the supervisor calls to hand the conversation to ``agent_name``."""
+    def handoff() -> str:
+        return f"Transferred to {agent_name}"
+
+    async def ahandoff() -> str:
+        return handoff()
+
+    return StructuredTool.from_function(
+        func=handoff,
+        coroutine=ahandoff,
+        name=f"{HANDOFF_PREFIX}{agent_name}",
+        description=f"Hand the conversation off to {agent_name}.",
+        # End the supervisor's turn as soon as it hands off
+        return_direct=True,
+    )
+
+
+def _content(message) -> str:
+    """Return message text for both dict messages and LangChain message objects."""
+    if isinstance(message, dict):
+        return message.get("content", "") or ""
+    content = getattr(message, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+def _agent_node(agent, output_mode="full_history"):
+    """Wrap an agent so it only emits its new messages, or only its result when fanned out.
+
+    With ``output_mode="last_message"`` only the agent's final reply is added to
+    the shared history; its tool calls and intermediate steps are dropped. A
+    fanned-out agent writes just ``agent_outputs``; the ``merge`` node adds the
+    one combined reply to the history. An agent run from the head of the
+    ``next_agents`` queue takes itself off it, so the handoffs after it run next.
+    """
+    def update(state, result):
+        new_messages = result["messages"][len(state["messages"]):]
+        if not state.get("fanout"):
+            queued = state.get("next_agents") or []
+            return {"messages": new_messages[-1:] if output_mode == "last_message" else new_messages,
+                    "next_agents": queued[1:] if queued[:1] == [agent.name] else []}
+        reply = _content(new_messages[-1]) if new_messages else ""
+        return {"agent_outputs": {agent.name: reply}}
+
+    def run(state, config):
+        with span(f"node.{agent.name}", agent=agent.name, fanout=bool(state.get("fanout"))), \
+                timed(NODE_SECONDS, node=agent.name):
+            return update(state, agent.invoke({"messages": state["messages"]}, config))
+
+    async def arun(state, config):
+        with span(f"node.{agent.name}", agent=agent.name, fanout=bool(state.get("fanout"))), \
+                timed(NODE_SECONDS, node=agent.name):
+            return update(state, await agent.ainvoke({"messages": state["messages"]}, config))
+
+    return RunnableLambda(run, afunc=arun, name=agent.name)
+
+
+def _phase(messages) -> str:
+    """"route" when the turn starts from a user message, "respond" after an agent replied."""
+    last = messages[-1] if messages else None
+    role = last.get("role") if isinstance(last, dict) else getattr(last, "type", None)
+    return "route" if role in ("user", "human") else "respond"
+
+
+def _supervisor_node(supervisors: Dict[str, Any], handoff_targets: Dict[str, str]):
+    """Wrap the per-phase supervisors so their handoff tool calls are recorded in ``next_agents``."""
+    def update(state, result):
+        new_messages = result["messages"][len(state["messages"]):]
+        next_agents = []
+        for message in reversed(new_messages):
+            tool_calls = getattr(message, "tool_calls", None)
+            if tool_calls:
+                next_agents = [handoff_targets[call["name"]] for call in tool_calls
+                               if call["name"] in handoff_targets]
+                break
+        current_span().set("handoffs", ",".join(next_agents))
+        for name in next_agents:
+            HANDOFFS.inc(agent=name)
+        return {"messages": new_messages, "next_agents": next_agents}
+
+    # Routing turns are short and block the user, so they go ahead of queued agent/batch calls
+    def run(state, config):
+        phase = _phase(state["messages"])
+        with span("node.supervisor", agent="supervisor", phase=phase), llm_priority("supervisor"), \
+                timed(NODE_SECONDS, node="supervisor"):
+            return update(state, supervisors[phase].invoke({"messages": state["messages"]}, config))
+
+    async def arun(state, config):
+        phase = _phase(state["messages"])
+        with span("node.supervisor", agent="supervisor", phase=phase), llm_priority("supervisor"), \
+                timed(NODE_SECONDS, node="supervisor"):
+            return update(state, await supervisors[phase].ainvoke({"messages": state["messages"]}, config))
+
+    return RunnableLambda(run, afunc=arun, name="supervisor")
+
 
 def create_supervisor(
     model,
     agents: List,
     prompt: str,
     add_handoff_back_messages: bool = True,
-    output_mode: str = "full_history"
+    output_mode: str = "full_history",
+    parallel_agents: Optional[List[str]] = None,
+    entry_router: Optional[Callable[[Dict[str, Any]], Optional[str]]] = None,
+    history_compactor=None,
+    phase_models: Optional[Dict[str, Any]] = None
 ):
     """
     Create a supervisor that can handoff to multiple agents.
+
+    The supervisor hands off by calling a ``transfer_to_<agent>`` tool. Its
+    tool calls are mapped to agent names and stored in ``next_agents``, which
+    the router reads directly, so routing never depends on the reply text.
+
+    Agents named in ``parallel_agents`` may be dispatched together: when the
+    supervisor hands off to several of them in one turn they run
+    concurrently, and a ``merge`` node joins their replies into a single
+    response instead of returning to the supervisor. Any other set of
+    handoffs runs one agent after another, in the order they were called.
+
+    ``entry_router`` runs before the supervisor on every turn. If it returns an
+    agent name the turn starts at that agent, skipping the supervisor's LLM
+    call; returning None starts at the supervisor as usual.
+
+    ``history_compactor`` (e.g. a ConversationCompactor) runs first on every
+    turn. When it folds old turns away, the stored history is replaced by its
+    compacted version, so checkpointed threads stay bounded as well.
+
+    ``phase_models`` optionally binds supervisor phases to their own models:
+    ``"route"`` (the turn starts from a user message) and ``"respond"`` (an
+    agent has just replied). Phases not listed use ``model``.
     """
-    # Create the supervisor agent
-    supervisor = create_react_agent(
-        model=model,
-        tools=[],
-        prompt=prompt,
-        name="supervisor"
-    )
-    
+    parallel_agents = list(parallel_agents or [])
+
+    # One handoff tool per agent; routing is a dict lookup on the tool name
+    handoff_tools = [create_handoff_tool(agent.name) for agent in agents]
+    handoff_targets = {tool.name: agent.name for tool, agent in zip(handoff_tools, agents)}
+
+    # Create the supervisor agent, once per distinct phase model
+    supervisors, by_model = {}, {}
+    for phase in ("route", "respond"):
+        phase_model = (phase_models or {}).get(phase, model)
+        if id(phase_model) not in by_model:
+            by_model[id(phase_model)] = create_react_agent(
+                model=phase_model,
+                tools=handoff_tools,
+                prompt=prompt,
+                name="supervisor"
+            )
+        supervisors[phase] = by_model[id(phase_model)]
+
     # Create the graph
-    workflow = StateGraph({"messages": []})
-    
+    workflow = StateGraph(SupervisorState)
+
     # Add nodes for each agent
-    workflow.add_node("supervisor", supervisor)
+    workflow.add_node("supervisor", _supervisor_node(supervisors, handoff_targets))
     for agent in agents:
-        workflow.add_node(agent.name, agent)
-    
-    # Add edges from supervisor to each agent
+        workflow.add_node(agent.name, _agent_node(agent, output_mode))
+
+    def after_agent(state):
+        if state.get("agent_outputs"):
+            return "merge"
+        if state.get("next_agents"):
+            return dispatch(state)  # more handoffs from the supervisor's turn are waiting
+        return "supervisor" if add_handoff_back_messages else END
+
+    def merge(state):
+        outputs = state.get("agent_outputs") or {}
+        with span("node.merge", agents=",".join(outputs)):
+            replies = [outputs[name] for name in parallel_agents if outputs.get(name)]
+            return {
+                "messages": [AIMessage(content="\n\n".join(replies), name="supervisor")],
+                "agent_outputs": None,
+                "next_agents": [],
+            }
+
+    # Add edges from each agent to the next queued agent, the merge or back to the supervisor
     for agent in agents:
-        workflow.add_edge("supervisor", agent.name)
-        if add_handoff_back_messages:
-            workflow.add_edge(agent.name, "supervisor")
-    
-    # Set entry point
-    workflow.set_entry_point("supervisor")
-    
+        workflow.add_conditional_edges(agent.name, after_agent)
+
+    if parallel_agents:
+        workflow.add_node("merge", merge)
+        workflow.add_edge("merge", END)
+
+    # Set entry point, optionally behind the history compactor
+    entry = START
+    if history_compactor is not None:
+        def compact(state):
+            with span("node.compact", messages=len(state["messages"])) as s:
+                result = history_compactor.compact(state["messages"], state.get("summary", ""), state.get("slots"))
+                s.set("folded", result["folded"])
+            if not result["folded"]:
+                return {}
+            return {
+                "messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES)] + result["messages"],
+                "summary": result["summary"],
+                "slots": result["slots"],
+            }
+
+        workflow.add_node("compact", compact)
+        workflow.add_edge(START, "compact")
+        entry = "compact"
+
+    if entry_router is None:
+        workflow.add_edge(entry, "supervisor")
+    else:
+        agent_names = {agent.name for agent in agents}
+
+        def route_entry(state):
+            target = entry_router(state)
+            return target if target in agent_names else "supervisor"
+
+        workflow.add_conditional_edges(entry, route_entry)
+
     # Add conditional edges from supervisor
-    def should_continue(state):
-        messages = state.get("messages", [])
-        if not messages:
-            return "supervisor"
-        
-        last_message = messages[-1]
-        content = last_message.get("content", "").lower()
-        
-        # Check if any agent should be called
-        for agent in agents:
-            if agent.name.lower() in content or f"handoff to {agent.name}" in content:
-                return agent.name
-        
-        return END
-    
-    workflow.add_conditional_edges("supervisor", should_continue)
-    
+    def dispatch(state):
+        selected = state.get("next_agents") or []
+        if not selected:
+            return END
+
+        # Several parallel agents at once: run them concurrently and join in `merge`
+        if len(selected) > 1 and all(name in parallel_agents for name in selected):
+            return [Send(name, {**state, "fanout": True}) for name in selected]
+
+        # Otherwise one at a time: the first agent takes itself off the queue and
+        # after_agent dispatches the rest
+        return selected[0]
+
+    workflow.add_conditional_edges("supervisor", dispatch)
+
     return workflow
@@ -1,25 +1,244 @@
+import functools
 import os
-from langchain_openai import ChatOpenAI
-
-# Initialize the LLM provider with error handling
-try:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in environment variables")
-    
-    ACTIVE_LLM = ChatOpenAI(
-        model="gpt-4o-mini",  # You can change this to gpt-4 or other models
-        temperature=0.7,
-        api_key=api_key
-    )
-except Exception as e:
-    # Create a dummy LLM for demo purposes
-    class DummyLLM:
-        def __init__(self):
-            self.model = "demo-mode"
-            self.temperature = 0.7
-        
-        def invoke(self, *args, **kwargs):
-            return "Demo mode: This would be an AI response in the full version."
-    
-    ACTIVE_LLM = DummyLLM()
+import threading
+
+
+class DummyLLM:
+    """Stand-in used when no OpenAI key is configured."""
+
+    def __init__(self):
+        self.model = "demo-mode"
+        self.temperature = 0.7
+
+    def invoke(self, *args, **kwargs):
+        return "Demo mode: This would be an AI response in the full version."
+
+    async def ainvoke(self, *args, **kwargs):
+        return self.invoke(*args, **kwargs)
+
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()  # or "fake" (see fake_llm.py)
+
+
+def llm_configured() -> bool:
+    """True when a real or fake chat model is available instead of the demo stub."""
+    return LLM_PROVIDER == "fake" or bool(os.getenv("OPENAI_API_KEY"))
+
+
+_scheduled_classes = {}
+
+
+def _scheduled(base):
+    """Subclass of chat model class ``base`` whose calls go through llm_scheduler (defined on first use)."""
+    if base in _scheduled_classes:
+        return _scheduled_classes[base]
+
+    from conversation_compactor import estimate_tokens
+    from llm_scheduler import coalescing_key, get_scheduler
+    from metrics import LLM_CALLS, LLM_TOKENS
+    from tracing import current_span, span
+
+    def _usage(model, result):
+        usage = (result.llm_output or {}).get("token_usage") or {}
+        active = current_span()
+        LLM_CALLS.inc(model=model)
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            if key in usage:
+                active.set(f"llm.{key}", usage[key])
+        for kind in ("prompt", "completion"):
+            if usage.get(f"{kind}_tokens"):
+                LLM_TOKENS.inc(usage[f"{kind}_tokens"], model=model, kind=kind)
+        return usage.get("total_tokens")
+
+    def _stream_usage(model, chunk):
+        """Tokens reported on one streamed chunk (input + output), or None if it carries no usage."""
+        usage = getattr(chunk.message, "usage_metadata", None) or {}
+        for kind, key in (("prompt", "input_tokens"), ("completion", "output_tokens")):
+            if usage.get(key):
+                LLM_TOKENS.inc(usage[key], model=model, kind=kind)
+        if not usage:
+            return None
+        return (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
+
+    class Scheduled(base):
+        """Waits for RPM/TPM capacity and coalesces identical in-flight prompts."""
+
+        def _estimate(self, messages):
+            return estimate_tokens(messages) + (getattr(self, "max_tokens", None) or 512)
+
+        def _key(self, messages, stop, kwargs):
+            params = [getattr(self, "model_name", None), getattr(self, "temperature", None)]
+            return coalescing_key(params, messages, stop, kwargs)
+
+        @property
+        def _model_label(self):
+            return getattr(self, "model_name", None) or type(self).__name__
+
+        def _span(self, kwargs, streaming=False):
+            return span("llm.call", model=self._model_label, tools=len(kwargs.get("tools") or ()),
+                        streaming=streaming)
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            call = functools.partial(super()._generate, messages, stop, run_manager, **kwargs)
+            with self._span(kwargs):
+                return get_scheduler().run(call, self._estimate(messages), self._key(messages, stop, kwargs),
+                                           functools.partial(_usage, self._model_label))
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            call = functools.partial(super()._agenerate, messages, stop, run_manager, **kwargs)
+            with self._span(kwargs):
+                return await get_scheduler().arun(call, self._estimate(messages),
+                                                  self._key(messages, stop, kwargs),
+                                                  functools.partial(_usage, self._model_label))
+
+        # Streamed calls are rate limited but not coalesced: each caller needs its own token stream.
+        # A span cannot stay open across yields, so it only covers the wait for capacity.
+        # The usage reported on the chunks replaces the estimate in the TPM bucket, as in _generate.
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            scheduler, tokens = get_scheduler(), self._estimate(messages)
+            with self._span(kwargs, streaming=True):
+                scheduler.acquire(tokens)
+            LLM_CALLS.inc(model=self._model_label)
+            used = None
+            try:
+                for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    reported = _stream_usage(self._model_label, chunk)
+                    if reported is not None:
+                        used = (used or 0) + reported
+                    yield chunk
+            finally:
+                scheduler.release(tokens, used)
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            scheduler, tokens = get_scheduler(), self._estimate(messages)
+            with self._span(kwargs, streaming=True):
+                await scheduler.aacquire(tokens)
+            LLM_CALLS.inc(model=self._model_label)
+            used = None
+            try:
+                async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    reported = _stream_usage(self._model_label, chunk)
+                    if reported is not None:
+                        used = (used or 0) + reported
+                    yield chunk
+            finally:
+                scheduler.release(tokens, used)
+
+    Scheduled.__name__ = Scheduled.__qualname__ = f"Scheduled{base.__name__}"
+    _scheduled_classes[base] = Scheduled
+    return Scheduled
+
+
+# Model tiers. Each can be overridden with LLM_TIER_<NAME>_MODEL / _TEMPERATURE /
+# _TIMEOUT / _MAX_RETRIES / _FALLBACKS (comma-separated tier names tried in order).
+MODEL_TIERS = {
+    "fast": {"model": "gpt-4o-mini", "temperature": 0.0, "timeout": 15.0, "max_retries": 1,
+             "fallbacks": ["standard"]},
+    "standard": {"model": "gpt-4o-mini", "temperature": 0.7, "timeout": 30.0, "max_retries": 2,
+                 "fallbacks": []},
+    "strong": {"model": "gpt-4o", "temperature": 0.7, "timeout": 60.0, "max_retries": 1,
+               "fallbacks": ["standard"]},
+}
+
+# Which tier serves each agent / supervisor phase; override with LLM_ROUTE_<ROLE>=<tier>
+MODEL_ROUTES = {
+    "default": "standard",
+    "supervisor_route": "fast",      # picking a handoff or asking for missing trip details
+    "supervisor_respond": "fast",    # relaying an agent's reply back to the user
+    "flight_agent": "standard",
+    "hotel_agent": "standard",
+    "itinerary_agent": "strong",     # long-form generation
+}
+
+
+def tier_config(tier) -> dict:
+    """Settings for ``tier``: the MODEL_TIERS defaults with LLM_TIER_* overrides applied."""
+    if tier not in MODEL_TIERS:
+        raise ValueError(f"unknown model tier: {tier!r}")
+    config = dict(MODEL_TIERS[tier])
+    prefix = f"LLM_TIER_{tier.upper()}_"
+    for key, cast in (("model", str), ("temperature", float), ("timeout", float), ("max_retries", int)):
+        value = os.getenv(prefix + key.upper())
+        if value:
+            config[key] = cast(value)
+    fallbacks = os.getenv(prefix + "FALLBACKS")
+    if fallbacks is not None:
+        config["fallbacks"] = [name.strip() for name in fallbacks.split(",") if name.strip()]
+    return config
+
+
+def route_tier(role) -> str:
+    """Tier name serving ``role`` (an agent name, a supervisor phase, or "default")."""
+    return os.getenv(f"LLM_ROUTE_{role.upper()}") or MODEL_ROUTES.get(role) or MODEL_ROUTES["default"]
+
+
+def _create_llm(tier="standard"):
+    # Misconfigured tiers raise here rather than silently falling back to the demo model
+    config = tier_config(tier)
+    fallback_configs = [tier_config(name) for name in config["fallbacks"] if name != tier]
+
+    if LLM_PROVIDER == "fake":
+        # Offline stand-in for load tests: same tiers and scheduler, no network
+        from fake_llm import FakeToolCallingChatModel
+        return _scheduled(FakeToolCallingChatModel)(
+            model_name=config["model"],
+            latency=os.getenv("LLM_FAKE_LATENCY", "lognormal:400,0.5"),
+            ms_per_token=float(os.getenv("LLM_FAKE_MS_PER_TOKEN", "0")),
+            seed=int(os.getenv("LLM_FAKE_SEED", "0")),
+        )
+
+    # Initialize the LLM provider with error handling
+    try:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+        # Imported here so loading this module does not pull in langchain_openai
+        from langchain_openai import ChatOpenAI
+        model_class = _scheduled(ChatOpenAI)
+
+        def create(config):
+            return model_class(
+                model=config["model"],
+                temperature=config["temperature"],
+                timeout=config["timeout"],
+                max_retries=config["max_retries"],
+                # Report token usage on streamed responses too, so the scheduler can correct its estimate
+                stream_usage=True,
+                api_key=api_key
+            )
+
+        model = create(config)
+        # A tier that times out or errors hands the call to the next tier in its chain
+        fallbacks = [create(fallback) for fallback in fallback_configs]
+        return model.with_fallbacks(fallbacks) if fallbacks else model
+    except Exception:
+        # Create a dummy LLM for demo purposes
+        return DummyLLM()
+
+
+_llms = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm(role="default"):
+    """Return the shared chat model for ``role``, creating it on first use.
+
+    Roles are agent names or supervisor phases (see MODEL_ROUTES); roles on
+    the same tier share one model instance.
+    """
+    tier = route_tier(role)
+    llm = _llms.get(tier)
+    if llm is None:
+        with _llm_lock:
+            llm = _llms.get(tier)
+            if llm is None:
+                llm = _llms[tier] = _create_llm(tier)
+    return llm
+
+
+def __getattr__(name):
+    # `from llm_provider import ACTIVE_LLM` keeps working, but builds the model lazily
+    if name == "ACTIVE_LLM":
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,337 @@
+"""
+LLM Scheduler - keeps chat-model calls inside the account's RPM/TPM quotas
+
+Every model call takes one request and its estimated tokens from two token
+buckets before it is sent. Waiting callers are served by priority lane
+(supervisor, then interactive, then batch) and in arrival order within a lane.
+Identical prompts already in flight are coalesced: followers wait for the
+leader's response instead of sending their own request. A 429 from the
+provider pauses the whole queue for its Retry-After.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import copy
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from tracing import current_span
+
+LANES = {"supervisor": 0, "interactive": 1, "batch": 2}
+
+_lane = contextvars.ContextVar("llm_lane", default="interactive")
+
+
+@contextlib.contextmanager
+def llm_priority(lane):
+    """Run model calls made inside the block in ``lane`` (supervisor, interactive or batch)."""
+    if lane not in LANES:
+        raise ValueError(f"unknown LLM priority lane: {lane!r}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class SchedulerTimeout(Exception):
+    """Raised when a call waits longer than the scheduler's queue timeout."""
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute up to ``capacity``; 0 disables the limit."""
+
+    def __init__(self, per_minute, capacity=None):
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self.level = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount, now) -> float:
+        """Seconds until ``amount`` units are available (0 when they are now)."""
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill(now)
+        # A single call larger than the bucket only has to wait for a full bucket
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60.0 / self.per_minute)
+
+    def available(self, now):
+        """Units available now, or None when the bucket is unlimited."""
+        if self.per_minute <= 0:
+            return None
+        self._refill(now)
+        return int(self.level)
+
+    def consume(self, amount):
+        if self.per_minute > 0:
+            self.level -= amount
+
+    def refund(self, amount):
+        """Return (or, when negative, take) tokens once the real usage is known."""
+        if self.per_minute > 0:
+            self.level = min(self.capacity, self.level + amount)
+
+
+def _message_fields(message):
+    if isinstance(message, dict):
+        return [message.get("role"), message.get("content"), message.get("tool_calls"),
+                message.get("tool_call_id"), message.get("name")]
+    return [getattr(message, "type", None), getattr(message, "content", None),
+            getattr(message, "tool_calls", None), getattr(message, "tool_call_id", None),
+            getattr(message, "name", None)]
+
+
+def coalescing_key(model_params, messages, stop=None, kwargs=None) -> str:
+    """Hash of everything that determines a response; message ids are ignored."""
+    payload = [model_params, [_message_fields(m) for m in messages], stop, kwargs or {}]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 1.0))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class LLMScheduler:
+    """Admission control for model calls: RPM/TPM token buckets, priority lanes, coalescing."""
+
+    def __init__(self, rpm=500, tpm=200000, queue_timeout=120.0, coalesce=True):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.queue_timeout = queue_timeout
+        self.coalesce = coalesce
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = []  # heap of (priority, seq, lane) tickets
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._pending = {}  # coalescing key -> Future of the leader's response
+        self._counters = {"requests": 0, "coalesced": 0, "throttled": 0, "rate_limited": 0,
+                          "timeouts": 0, "wait_seconds": 0.0, "tokens_estimated": 0, "tokens_used": 0}
+
+    # --- Admission -----------------------------------------------------------
+
+    def _ticket(self):
+        lane = _lane.get()
+        return (LANES[lane], next(self._seq), lane)
+
+    def _try_admit(self, ticket, tokens):
+        """With the lock held: admit ``ticket`` and return 0, or return how long to wait."""
+        if self._queue[0] != ticket:
+            return None  # someone with higher priority or an earlier ticket goes first
+        now = time.monotonic()
+        wait = max(self._paused_until - now,
+                   self.requests.wait_time(1, now),
+                   self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        heapq.heappop(self._queue)
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+        self.in_flight += 1
+        self._counters["requests"] += 1
+        self._counters["tokens_estimated"] += tokens
+        self._wakeup.notify_all()
+        return 0
+
+    def _abandon(self, ticket):
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._counters["timeouts"] += 1
+        self._wakeup.notify_all()
+
+    def _record_wait(self, started):
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self._counters["throttled"] += 1
+            self._counters["wait_seconds"] += waited
+        current_span().set("llm.queue_wait_ms", round(waited * 1000, 2))
+
+    def acquire(self, tokens):
+        """Block until a call of ``tokens`` estimated tokens may be sent."""
+        started = time.monotonic()
+        with self._lock:
+            ticket = self._ticket()
+            heapq.heappush(self._queue, ticket)
+            while True:
+                wait = self._try_admit(ticket, tokens)
+                if wait == 0:
+                    self._record_wait(started)
+                    return
+                if time.monotonic() - started > self.queue_timeout:
+                    self._abandon(ticket)
+                    raise SchedulerTimeout(f"waited more than {self.queue_timeout}s for LLM capacity")
+                self._wakeup.wait(min(wait or 0.25, 0.25))
+
+    async def aacquire(self, tokens):
+        """Async counterpart of acquire(); polls instead of blocking the event loop."""
+        started = time.monotonic()
+        with self._lock:
+            ticket = self._ticket()
+            heapq.heappush(self._queue, ticket)
+        while True:
+            with self._lock:
+                wait = self._try_admit(ticket, tokens)
+                if wait == 0:
+                    self._record_wait(started)
+                    return
+                if time.monotonic() - started > self.queue_timeout:
+                    self._abandon(ticket)
+                    raise SchedulerTimeout(f"waited more than {self.queue_timeout}s for LLM capacity")
+            try:
+                await asyncio.sleep(min(wait or 0.02, 0.25))
+            except asyncio.CancelledError:
+                # A cancelled caller must not stay at the head of the queue
+                with self._lock:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._wakeup.notify_all()
+                raise
+
+    def release(self, estimated, used=None):
+        """Mark a call finished; ``used`` (actual tokens) corrects the TPM bucket."""
+        with self._lock:
+            self.in_flight -= 1
+            if used is not None:
+                self.tokens.refund(estimated - used)
+                self._counters["tokens_used"] += used
+            self._wakeup.notify_all()
+
+    def rate_limited(self, retry_after=1.0):
+        """Pause every lane after a provider 429, instead of letting callers retry into it."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._counters["rate_limited"] += 1
+
+    # --- Calls ---------------------------------------------------------------
+
+    def _join(self, key):
+        """Return (future, is_leader) for ``key``; None key disables coalescing."""
+        if key is None or not self.coalesce:
+            return Future(), True
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return future, False
+            future = self._pending[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+        if error is not None:
+            if getattr(error, "status_code", None) == 429:
+                self.rate_limited(_retry_after(error))
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, call, tokens, key=None, usage=None):
+        """Run ``call()`` once admitted, sharing the result with identical in-flight calls.
+
+        ``usage`` maps the result to the tokens actually used, or None if unknown.
+        """
+        future, leader = self._join(key)
+        current_span().set("llm.coalesced", not leader)
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            self.acquire(tokens)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        used = None
+        try:
+            result = call()
+            used = usage(result) if usage else None
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        finally:
+            self.release(tokens, used)
+        self._finish(key, future, result)
+        return result
+
+    async def arun(self, call, tokens, key=None, usage=None):
+        """Async counterpart of run(); ``call`` returns an awaitable."""
+        future, leader = self._join(key)
+        current_span().set("llm.coalesced", not leader)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(future))
+        try:
+            await self.aacquire(tokens)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        used = None
+        try:
+            result = await call()
+            used = usage(result) if usage else None
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        finally:
+            self.release(tokens, used)
+        self._finish(key, future, result)
+        return result
+
+    def stats(self) -> dict:
+        """Queue depth per lane, in-flight calls and cumulative counters."""
+        with self._lock:
+            now = time.monotonic()
+            queued = {lane: 0 for lane in LANES}
+            for _, _, lane in self._queue:
+                queued[lane] += 1
+            return {
+                "queue_depth": len(self._queue),
+                "queued": queued,
+                "in_flight": self.in_flight,
+                "coalescing": len(self._pending),
+                "paused_seconds": round(max(0.0, self._paused_until - now), 3),
+                "requests_available": self.requests.available(now),
+                "tokens_available": self.tokens.available(now),
+                **self._counters,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def scheduler_from_env() -> LLMScheduler:
+    """Build the scheduler configured by LLM_* environment variables."""
+    return LLMScheduler(
+        rpm=int(os.getenv("LLM_RPM", "500")),
+        tpm=int(os.getenv("LLM_TPM", "200000")),
+        queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "120")),
+        coalesce=os.getenv("LLM_COALESCE", "true").lower() in ("1", "true", "yes"),
+    )
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler shared by every model instance."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = scheduler_from_env()
+    return _scheduler
@@ -0,0 +1,295 @@
+"""
+Metrics - in-process counters, gauges and histograms in Prometheus text format
+
+    with track_turn("api"):
+        graph.invoke(state, config)
+
+    @instrumented("search_hotels")
+    def search_hotels(...): ...
+
+The registry is per process: with several API workers, scrape each one (or
+run a single worker behind the load balancer's health checks). render()
+produces the text exposition format served at GET /metrics; snapshot() returns
+the same values as a dict for the launcher and the debug panel.
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Status of the innermost instrumented() call, so mark_failed() can flip it
+_call_status = contextvars.ContextVar("metrics_call_status", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self):
+        """[(suffix, label values, extra labels, value)] for the exposition format."""
+        with self._lock:
+            return [("", key, (), value) for key, value in sorted(self._values.items())]
+
+    def snapshot(self):
+        with self._lock:
+            return {",".join(key): value for key, value in sorted(self._values.items())}
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. turns served or tokens spent."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. conversations in flight."""
+
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values (seconds unless the name says otherwise)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            rows = []
+            for key, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    rows.append(("_bucket", key, (("le", _format_value(float(bound))),), bucket_count))
+                rows.append(("_bucket", key, (("le", "+Inf"),), count))
+                rows.append(("_sum", key, (), total))
+                rows.append(("_count", key, (), count))
+            return rows
+
+    def snapshot(self):
+        with self._lock:
+            return {",".join(key): {"count": count, "sum": round(total, 6)}
+                    for key, (counts, total, count) in sorted(self._values.items())}
+
+
+class Registry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, key, extra, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(metric.labels, key, extra)} "
+                             f"{_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+
+REGISTRY = Registry()
+
+# Conversation turns (graph.invoke / graph.stream)
+TURNS = REGISTRY.counter(
+    "travel_light_turns_total", "Conversation turns served.", ("entrypoint", "status"))
+TURN_SECONDS = REGISTRY.histogram(
+    "travel_light_turn_duration_seconds", "Wall time of one conversation turn.", ("entrypoint",))
+IN_FLIGHT = REGISTRY.gauge(
+    "travel_light_conversations_in_flight", "Conversation turns currently running.", ("entrypoint",))
+
+# Graph nodes and routing
+NODE_SECONDS = REGISTRY.histogram(
+    "travel_light_node_duration_seconds", "Wall time of one graph node run.", ("node",))
+HANDOFFS = REGISTRY.counter(
+    "travel_light_handoffs_total", "Supervisor handoffs to each agent.", ("agent",))
+
+# Tools and provider calls
+TOOL_CALLS = REGISTRY.counter(
+    "travel_light_tool_calls_total", "Tool and provider helper calls.", ("tool", "status"))
+TOOL_SECONDS = REGISTRY.histogram(
+    "travel_light_tool_duration_seconds", "Wall time of tool and provider helper calls.", ("tool",))
+PROVIDER_RESPONSES = REGISTRY.counter(
+    "travel_light_provider_responses_total",
+    "Provider HTTP responses by status class (2xx/4xx/5xx, or error when no response arrived).",
+    ("host", "status_class"))
+PROVIDER_SECONDS = REGISTRY.histogram(
+    "travel_light_provider_request_duration_seconds",
+    "Provider HTTP request time including retries.", ("host",))
+
+# LLM spend
+LLM_CALLS = REGISTRY.counter("travel_light_llm_calls_total", "Chat model calls.", ("model",))
+LLM_TOKENS = REGISTRY.counter(
+    "travel_light_llm_tokens_total", "Tokens reported by the provider.", ("model", "kind"))
+
+
+def status_class(status_code):
+    """Group an HTTP status code as 2xx, 3xx, 4xx or 5xx."""
+    return f"{int(status_code) // 100}xx"
+
+
+@contextlib.contextmanager
+def timed(histogram, **labels):
+    """Observe the duration of the enclosed block, whether or not it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - started, **labels)
+
+
+@contextlib.contextmanager
+def track_turn(entrypoint):
+    """Count one conversation turn and keep the in-flight gauge current while it runs."""
+    IN_FLIGHT.inc(entrypoint=entrypoint)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        IN_FLIGHT.dec(entrypoint=entrypoint)
+        TURN_SECONDS.observe(time.perf_counter() - started, entrypoint=entrypoint)
+        TURNS.inc(entrypoint=entrypoint, status=status)
+
+
+def mark_failed():
+    """Record the current instrumented call as an error without raising.
+
+    For tools that catch provider failures and return an error message to the agent.
+    """
+    status = _call_status.get()
+    if status is not None:
+        status[0] = "error"
+
+
+def instrumented(tool):
+    """Decorator counting calls of a sync or async function by status and timing them."""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                status = ["ok"]
+                token = _call_status.set(status)
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    status[0] = "error"
+                    raise
+                finally:
+                    _call_status.reset(token)
+                    TOOL_SECONDS.observe(time.perf_counter() - started, tool=tool)
+                    TOOL_CALLS.inc(tool=tool, status=status[0])
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            status = ["ok"]
+            token = _call_status.set(status)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                status[0] = "error"
+                raise
+            finally:
+                _call_status.reset(token)
+                TOOL_SECONDS.observe(time.perf_counter() - started, tool=tool)
+                TOOL_CALLS.inc(tool=tool, status=status[0])
+        return wrapper
+    return decorate
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    return REGISTRY.render()
+
+
+def snapshot():
+    """All metrics as {name: {labels: value}}; histograms report count and sum."""
+    return REGISTRY.snapshot()
@@ -0,0 +1,284 @@
+"""
+Provider Client - shared, pooled HTTP layer for the Amadeus and AviationStack APIs
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from importlib.util import find_spec
+from urllib.parse import urlsplit
+
+from metrics import PROVIDER_RESPONSES, PROVIDER_SECONDS, status_class, timed
+from tracing import span
+
+# requests and httpx are imported on first use to keep module import cheap.
+# httpx is optional: it provides native async requests, and HTTP/2 when its h2
+# extra is installed as well (pip install "httpx[http2]")
+HTTPX_AVAILABLE = find_spec("httpx") is not None
+HTTP2_AVAILABLE = HTTPX_AVAILABLE and find_spec("h2") is not None
+
+CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("PROVIDER_READ_TIMEOUT", "15"))
+MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "2"))
+POOL_SIZE = int(os.getenv("PROVIDER_POOL_SIZE", "10"))
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 4.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+STREAM_CHUNK_SIZE = 16384
+
+
+class ProviderClient:
+    """HTTP client with one keep-alive connection pool per provider host.
+
+    Every call gets connect/read timeouts and a bounded retry budget. Connection
+    errors, timeouts and retryable status codes are retried with full-jitter
+    exponential backoff, honouring ``Retry-After`` on 429/503 responses.
+
+    The ``a``-prefixed methods are the asyncio counterparts. They use pooled
+    ``httpx.AsyncClient`` instances when httpx is installed and otherwise run
+    the blocking request in a worker thread. Async clients are bound to the
+    event loop that created them, so they are pooled per running loop and
+    dropped once that loop is closed.
+
+    With ``stream=True`` the body is left unread so large payloads can be
+    parsed incrementally (see iter_body and json_stream.ArrayStream); the
+    caller must close the response (``aclose()`` on the async path).
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, pool_size=POOL_SIZE, use_http2=None):
+        if use_http2 is None:
+            use_http2 = HTTP2_AVAILABLE and os.getenv("PROVIDER_HTTP2", "1") != "0"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.use_http2 = use_http2 and HTTP2_AVAILABLE
+
+        self._sessions = {}
+        self._async_sessions = weakref.WeakKeyDictionary()  # event loop -> {host: AsyncClient}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        if self.use_http2:
+            import httpx
+            return httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=self.pool_size,
+                                    max_keepalive_connections=self.pool_size),
+            )
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _new_async_session(self):
+        import httpx
+        return httpx.AsyncClient(
+            http2=self.use_http2,
+            limits=httpx.Limits(max_connections=self.pool_size,
+                                max_keepalive_connections=self.pool_size),
+        )
+
+    def _session_for(self, url, pool=None, factory=None):
+        pool = self._sessions if pool is None else pool
+        factory = factory or self._new_session
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        session = pool.get(host)
+        if session is None:
+            with self._lock:
+                session = pool.get(host)
+                if session is None:
+                    session = pool[host] = factory()
+        return session
+
+    def _loop_sessions(self):
+        """This event loop's async client pool; pools of closed loops are discarded."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for closed in [other for other in self._async_sessions if other.is_closed()]:
+                del self._async_sessions[closed]
+            return self._async_sessions.setdefault(loop, {})
+
+    def _timeout(self, timeout, use_httpx=None):
+        if use_httpx is None:
+            use_httpx = self.use_http2
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        if use_httpx:
+            import httpx
+            return httpx.Timeout(timeout[1], connect=timeout[0])
+        return timeout
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_CAP)
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+    @staticmethod
+    def _span(method, url):
+        parts = urlsplit(url)
+        return span("http.request", **{"http.method": method, "http.host": parts.netloc, "http.path": parts.path})
+
+    def _send(self, session, method, url, timeout, stream, kwargs):
+        if not stream:
+            return session.request(method, url, timeout=self._timeout(timeout), **kwargs)
+        if self.use_http2:
+            request = session.build_request(method, url, timeout=self._timeout(timeout), **kwargs)
+            return session.send(request, stream=True)
+        return session.request(method, url, timeout=self._timeout(timeout), stream=True, **kwargs)
+
+    def request(self, method, url, timeout=None, retries=None, stream=False, **kwargs):
+        """Send a request through the host's pooled session, retrying transient failures."""
+        session = self._session_for(url)
+        retries = self.max_retries if retries is None else retries
+        if self.use_http2:
+            import httpx
+            transient = (httpx.TransportError,)
+        else:
+            import requests
+            transient = (requests.ConnectionError, requests.Timeout)
+
+        attempt = 0
+        host = urlsplit(url).netloc
+        with self._span(method, url) as s, timed(PROVIDER_SECONDS, host=host):
+            while True:
+                try:
+                    response = self._send(session, method, url, timeout, stream, kwargs)
+                except transient:
+                    PROVIDER_RESPONSES.inc(host=host, status_class="error")
+                    if attempt >= retries:
+                        raise
+                    time.sleep(self._backoff(attempt))
+                else:
+                    s.set("http.status_code", response.status_code)
+                    PROVIDER_RESPONSES.inc(host=host, status_class=status_class(response.status_code))
+                    if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                        return response
+                    response.close()
+                    time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                s.set("http.retries", attempt)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def arequest(self, method, url, timeout=None, retries=None, stream=False, **kwargs):
+        """Async version of :meth:`request` with the same timeout and retry policy."""
+        if not HTTPX_AVAILABLE:
+            # The body is read in the worker thread; aiter_body then yields it in one piece
+            return await asyncio.to_thread(self.request, method, url, timeout=timeout,
+                                           retries=retries, **kwargs)
+
+        import httpx
+        session = self._session_for(url, self._loop_sessions(), self._new_async_session)
+        retries = self.max_retries if retries is None else retries
+
+        attempt = 0
+        host = urlsplit(url).netloc
+        with self._span(method, url) as s, timed(PROVIDER_SECONDS, host=host):
+            while True:
+                try:
+                    if stream:
+                        request = session.build_request(method, url, timeout=self._timeout(timeout, True), **kwargs)
+                        response = await session.send(request, stream=True)
+                    else:
+                        response = await session.request(method, url, timeout=self._timeout(timeout, True), **kwargs)
+                except httpx.TransportError:
+                    PROVIDER_RESPONSES.inc(host=host, status_class="error")
+                    if attempt >= retries:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                else:
+                    s.set("http.status_code", response.status_code)
+                    PROVIDER_RESPONSES.inc(host=host, status_class=status_class(response.status_code))
+                    if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                        return response
+                    await response.aclose()
+                    await asyncio.sleep(self._backoff(attempt, response))
+                attempt += 1
+                s.set("http.retries", attempt)
+
+    async def aget(self, url, **kwargs):
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url, **kwargs):
+        return await self.arequest("POST", url, **kwargs)
+
+    def close(self):
+        """Close every pooled sync session."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    async def aclose(self):
+        """Close the async sessions pooled for the running event loop."""
+        with self._lock:
+            sessions = list(self._async_sessions.pop(asyncio.get_running_loop(), {}).values())
+        for session in sessions:
+            await session.aclose()
+
+
+def iter_body(response, chunk_size=STREAM_CHUNK_SIZE):
+    """Body chunks of a (streamed) response from either HTTP stack."""
+    if hasattr(response, "iter_content"):
+        return response.iter_content(chunk_size)
+    return response.iter_bytes(chunk_size)
+
+
+async def aiter_body(response, chunk_size=STREAM_CHUNK_SIZE):
+    """Async body chunks; a response fetched without httpx arrives as one chunk."""
+    if hasattr(response, "aiter_bytes"):
+        async for chunk in response.aiter_bytes(chunk_size):
+            yield chunk
+    else:
+        yield response.content
+
+
+def body_text(response):
+    """Text of a streamed response (error bodies are small, so they are read in full)."""
+    if hasattr(response, "read") and not hasattr(response, "iter_content"):
+        response.read()
+    return response.text
+
+
+async def abody_text(response):
+    if hasattr(response, "aread"):
+        await response.aread()
+    return response.text
+
+
+async def aclose_response(response):
+    """Close a response from either arequest path."""
+    if hasattr(response, "aclose"):
+        await response.aclose()
+    else:
+        response.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_provider_client():
+    """Return the process-wide ProviderClient, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = ProviderClient()
+    return _default_client
@@ -6,6 +6,8 @@ Travel Light Launcher - Choose how to run the travel planning application
 import os
 import sys
 import subprocess
+import time
+import urllib.request
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -34,7 +36,8 @@ def show_menu():
     print("2. 💻 Command Line Interface")
     print("3. 🎮 Demo Version (No API keys needed)")
     print("4. 🔧 Check Setup")
-    print("5. ❌ Exit")
+    print("5. 📊 Metrics Snapshot (from a running api_server.py)")
+    print("6. ❌ Exit")
     print()
 
 def run_web_interface():
@@ -116,6 +119,29 @@ def check_setup():
         else:
             print(f"❌ {file}")
 
+def dump_metrics():
+    """Scrape the API server's /metrics endpoint, print the totals and save the full snapshot."""
+    url = os.getenv("METRICS_URL", f"http://localhost:{os.getenv('API_PORT', '8000')}/metrics")
+    print(f"📊 Scraping {url} ...")
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            text = response.read().decode()
+    except Exception as e:
+        print(f"❌ Could not reach the metrics endpoint: {e}")
+        print("💡 Start the API first: python api_server.py")
+        return
+
+    path = f"metrics_snapshot_{time.strftime('%Y%m%d_%H%M%S')}.prom"
+    with open(path, "w") as f:
+        f.write(text)
+
+    # Bucket lines are only useful to Prometheus; show counters, gauges, sums and counts
+    print()
+    for line in text.splitlines():
+        if line and not line.startswith("#") and "_bucket{" not in line:
+            print(f"   {line}")
+    print(f"\n💾 Full snapshot saved to {path}")
+
 def main():
     """Main launcher function."""
     if not check_dependencies():
@@ -125,7 +151,7 @@ def main():
         show_menu()
         
         try:
-            choice = input("Enter your choice (1-5): ").strip()
+            choice = input("Enter your choice (1-6): ").strip()
             
             if choice == "1":
                 run_web_interface()
@@ -137,10 +163,13 @@ def main():
                 check_setup()
                 input("\nPress Enter to continue...")
             elif choice == "5":
+                dump_metrics()
+                input("\nPress Enter to continue...")
+            elif choice == "6":
                 print("👋 Goodbye!")
                 break
             else:
-                print("❌ Invalid choice. Please enter 1-5.")
+                print("❌ Invalid choice. Please enter 1-6.")
                 
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
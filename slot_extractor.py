@@ -0,0 +1,145 @@
+"""
+Slot Extractor - rule-based (destination, days, budget) extraction for trip requests
+
+Lets the graph skip the supervisor's slot-collection LLM turn when the user's
+message already states everything needed to plan an itinerary.
+"""
+
+import re
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+}
+
+BUDGET_TIERS = {
+    "budget": "budget", "cheap": "budget", "affordable": "budget", "backpacker": "budget",
+    "backpacking": "budget", "low-cost": "budget", "low cost": "budget",
+    "mid-range": "mid-range", "midrange": "mid-range", "mid range": "mid-range",
+    "moderate": "mid-range", "standard": "mid-range",
+    "luxury": "luxury", "luxurious": "luxury", "high-end": "luxury", "upscale": "luxury",
+    "5-star": "luxury", "five-star": "luxury",
+}
+
+_NUMBER = r"(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")"
+_DAYS_RE = re.compile(_NUMBER + r"[\s-]*(days?|nights?|weeks?)\b", re.IGNORECASE)
+_WEEKEND_RE = re.compile(r"\b(?:a|one|the)?\s*weekend\b", re.IGNORECASE)
+_WEEK_RE = re.compile(r"\b(?:a|one)\s+week\b", re.IGNORECASE)
+_BUDGET_RE = re.compile(
+    r"\b(" + "|".join(sorted((re.escape(k) for k in BUDGET_TIERS), key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+# Destination follows a preposition and runs until a clause boundary or a slot word
+_DEST_RE = re.compile(
+    r"\b(?:to|in|for|visit|visiting|around|explore|exploring)\s+"
+    r"(?:the\s+)?(?!a\b|an\b|my\b|\d)"
+    r"([a-zA-Z][\w'.-]*(?:[ ](?!(?:on|for|to|with|in|during|under|next|this|from|and|trip|itinerary|"
+    r"vacation|holiday|please|budget|luxury|days?|nights?)\b)[a-zA-Z][\w'.-]*){0,3})",
+    re.IGNORECASE,
+)
+_PLANNING_RE = re.compile(r"\b(plan|trip|itinerary|vacation|holiday|getaway|travel)\b", re.IGNORECASE)
+# Hotel, flight and booking requests go through the supervisor even when they mention the trip
+_BOOKING_RE = re.compile(
+    r"\b(hotels?|flights?|fly|flying|airfares?|tickets?|book|booking|booked|reserve|reservations?|"
+    r"accommodations?|lodging|rooms?)\b",
+    re.IGNORECASE,
+)
+# Words a bare plan request may contain besides its slots ("Please plan me a 3-day budget trip to Rome")
+_REQUEST_WORDS = {
+    "plan", "planning", "create", "make", "build", "give", "get", "suggest", "need", "want", "like", "would",
+    "could", "can", "please", "i", "i'd", "we", "we'd", "me", "us", "you", "a", "an", "the", "my", "our",
+    "trip", "itinerary", "vacation", "holiday", "getaway", "travel", "to", "in", "for", "of", "on", "day",
+    "days", "night", "nights", "week", "weeks", "weekend", "long", "and",
+}
+_NOT_DESTINATION = {"me", "us", "you", "it", "them", "days", "day", "budget", "luxury", "two", "one"}
+
+
+def _to_int(token: str) -> int:
+    token = token.lower()
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def extract_slots(text: str) -> dict:
+    """Return whichever of destination, days and budget the text states."""
+    slots = {}
+
+    days = _DAYS_RE.search(text)
+    if days:
+        count, unit = _to_int(days.group(1)), days.group(2).lower()
+        if unit.startswith("week"):
+            count *= 7
+        slots["days"] = count
+    elif _WEEK_RE.search(text):
+        slots["days"] = 7
+    elif _WEEKEND_RE.search(text):
+        slots["days"] = 2
+
+    budget = _BUDGET_RE.search(text)
+    if budget:
+        slots["budget"] = BUDGET_TIERS[budget.group(1).lower()]
+
+    for match in _DEST_RE.finditer(text):
+        destination = match.group(1).strip(" .'")
+        if destination.lower() not in _NOT_DESTINATION:
+            slots["destination"] = destination.title() if destination.islower() else destination
+            break
+
+    return slots
+
+
+def slots_complete(slots: dict) -> bool:
+    return all(slots.get(key) for key in ("destination", "days", "budget"))
+
+
+def is_plan_request(text: str) -> bool:
+    """True when ``text`` asks for an itinerary (not hotels, flights or a booking) and states every slot."""
+    return bool(_PLANNING_RE.search(text)) and not _BOOKING_RE.search(text) and slots_complete(extract_slots(text))
+
+
+def request_details(text: str) -> str:
+    """What a request asks for beyond destination, days and budget, as lowercase words.
+
+    "" for "Plan a 3-day budget trip to Rome"; "solo" for "Plan a 3-day solo budget
+    trip to Bali"; "love street art" for "... to Rome, I love street art".
+    """
+    rest = text
+    for pattern in (_DAYS_RE, _WEEK_RE, _WEEKEND_RE, _BUDGET_RE):
+        rest = pattern.sub(" ", rest)
+    destination = extract_slots(text).get("destination")
+    if destination:
+        rest = re.sub(re.escape(destination), " ", rest, flags=re.IGNORECASE)
+    return " ".join(word for word in re.findall(r"[a-z']+", rest.lower()) if word not in _REQUEST_WORDS)
+
+def _role(message) -> str:
+    if isinstance(message, dict):
+        return message.get("role", "")
+    return {"human": "user", "ai": "assistant"}.get(getattr(message, "type", ""), "")
+
+
+def _text(message) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+def conversation_slots(messages) -> dict:
+    """Slots gathered from every user message, later messages overriding earlier ones."""
+    slots = {}
+    for message in messages:
+        if _role(message) == "user":
+            slots.update(extract_slots(_text(message)))
+    return slots
+
+
+def planning_entry_router(state, agent_name="itinerary_agent"):
+    """Route straight to the itinerary agent when the latest user message is a complete plan request.
+
+    Returns the agent name, or None to let the supervisor handle the turn (also for any
+    message asking for hotels, flights or a booking, such as "Find hotels for my 3-day budget trip").
+    """
+    messages = state.get("messages", [])
+    if not messages or _role(messages[-1]) != "user":
+        return None
+    text = _text(messages[-1])
+    if not is_plan_request(text):
+        return None
+    return agent_name
@@ -0,0 +1,38 @@
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import create_react_agent
+
+from conversation_stream import astream_conversation, stream_conversation
+from fake_llm import FakeToolCallingChatModel
+from langgraph_supervisor import create_supervisor
+
+
+def _graph():
+    model = FakeToolCallingChatModel()
+    agent = create_react_agent(model=model, tools=[], prompt="Plan trips.", name="itinerary_agent")
+    return create_supervisor(model=model, agents=[agent], prompt="Route requests.",
+                             entry_router=lambda state: "itinerary_agent").compile(checkpointer=MemorySaver())
+
+
+def _check(events):
+    tokens = [event for event in events if event["type"] == "token"]
+    reply = events[-1]["state"]["messages"][-1].content
+    assert len([event for event in tokens if event["node"] == "itinerary_agent"]) > 1
+    # The supervisor's relay streams only what it adds to the agent's reply
+    assert "".join(event["content"] for event in tokens if event["node"] == "supervisor") == \
+        "\n\nDoes this look good to you?"
+    assert "".join(event["content"] for event in tokens) == reply
+
+
+def test_agent_reply_is_streamed_token_by_token_once():
+    state = {"messages": [{"role": "user", "content": "Plan a 3-day budget trip to Rome"}]}
+    _check(list(stream_conversation(_graph(), state, {"configurable": {"thread_id": "sync"}})))
+
+
+def test_async_stream_matches():
+    import asyncio
+
+    async def collect():
+        state = {"messages": [{"role": "user", "content": "Plan a 2-day trip to Lisbon"}]}
+        return [event async for event in astream_conversation(_graph(), state, {"configurable": {"thread_id": "a"}})]
+
+    _check(asyncio.run(collect()))
@@ -0,0 +1,24 @@
+import pytest
+
+from iata_index import get_iata_index, resolution_note, resolve_city_code
+
+
+def test_short_names_are_not_fuzzy_matched_to_other_cities():
+    with pytest.raises(ValueError, match="Nara"):
+        resolve_city_code("Nara")
+    assert resolve_city_code("Paris") == "PAR"
+
+
+def test_loosely_read_places_are_reported():
+    assert resolve_city_code("Pariss") == "PAR"
+    assert resolution_note("Pariss") == "interpreted 'Pariss' as Paris, FR (PAR)"
+    assert "Paris, FR" in resolution_note("Paris, Texas")
+    assert resolution_note("Paris, France") == ""
+
+
+def test_only_capitalised_unknown_codes_pass_through():
+    assert resolve_city_code("XYZ") == "XYZ"
+    assert "not in the local IATA index" in resolution_note("XYZ")
+    with pytest.raises(ValueError):
+        resolve_city_code("xyz")
+    assert get_iata_index().lookup("Goa").code == "GOI"
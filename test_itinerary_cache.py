@@ -0,0 +1,76 @@
+from itinerary_cache import CachedItineraryAgent, ItineraryCache
+
+PARIS = "Plan a 3-day budget trip to Paris, I love food markets and street art and museums"
+
+
+def test_similar_request_for_another_city_misses():
+    cache = ItineraryCache()
+    cache.store(PARIS, "Paris itinerary")
+    assert cache.lookup(PARIS.replace("Paris", "Pisa")) is None
+    assert cache.lookup(PARIS.replace("Paris", "Nice")) is None
+    assert cache.stats()["similar_hits"] == 0
+
+
+class _Agent:
+    name = "itinerary_agent"
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, state, config=None):
+        self.calls += 1
+        reply = {"role": "assistant", "name": self.name, "content": f"itinerary v{self.calls}"}
+        return {"messages": list(state["messages"]) + [reply]}
+
+
+def test_follow_up_reaches_the_agent():
+    agent = _Agent()
+    cached = CachedItineraryAgent(agent, ItineraryCache())
+    messages = [{"role": "user", "content": "Plan a 3-day budget trip to Paris"}]
+    messages = cached.invoke({"messages": messages})["messages"]
+    messages.append({"role": "user", "content": "Please make day 2 more relaxed and add vegetarian restaurants"})
+    result = cached.invoke({"messages": messages})
+    assert agent.calls == 2
+    assert result["messages"][-1]["content"] == "itinerary v2"
+
+
+def test_preferences_are_matched_by_similarity_not_by_the_generic_itinerary():
+    agent = _Agent()
+    cache = ItineraryCache()
+    cached = CachedItineraryAgent(agent, cache)
+    cached.invoke({"messages": [{"role": "user", "content": "Plan a 3-day budget trip to Paris"}]})
+    cached.invoke({"messages": [{"role": "user", "content": PARIS}]})
+    assert agent.calls == 2
+
+    reworded = "Plan a 3-day budget trip to Paris, I love museums, street art and food markets"
+    result = cached.invoke({"messages": [{"role": "user", "content": reworded}]})
+    assert agent.calls == 2
+    assert result["messages"][-1].content == "itinerary v2"
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_demo_prompt_is_cached():
+    agent = _Agent()
+    cached = CachedItineraryAgent(agent, ItineraryCache())
+    for _ in range(2):
+        cached.invoke({"messages": [{"role": "user", "content": "Plan a 3-day solo budget trip to Bali"}]})
+    assert agent.calls == 1
+
+
+def test_repeat_plan_request_is_served_from_the_cache():
+    agent = _Agent()
+    cached = CachedItineraryAgent(agent, ItineraryCache())
+    cached.invoke({"messages": [{"role": "user", "content": "Plan a 3-day budget trip to Paris"}]})
+    result = cached.invoke({"messages": [{"role": "user", "content": "please plan me a 3 day budget trip to paris"}]})
+    assert agent.calls == 1
+    assert result["messages"][-1].content == "itinerary v1"
+
+
+def test_invalidate_matches_any_case():
+    cache = ItineraryCache()
+    cache.store("Plan a 3-day Budget trip to Paris", "Paris itinerary")
+    cache.store("Plan a 3-day budget trip to Rome", "Rome itinerary")
+    cache.invalidate(destination="paris")
+    assert cache.stats()["entries"] == 1
+    cache.invalidate(destination="ROME", budget="Budget")
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,27 @@
+from langgraph.prebuilt import create_react_agent
+
+from fake_llm import FakeToolCallingChatModel
+from langgraph_supervisor import create_supervisor
+
+
+def _run(parallel_agents):
+    model = FakeToolCallingChatModel()
+    agents = [create_react_agent(model=model, tools=[], prompt="Help.", name=name)
+              for name in ("hotel_agent", "flight_agent")]
+    graph = create_supervisor(model=model, agents=agents, prompt="Route requests.",
+                              output_mode="last_message", parallel_agents=parallel_agents).compile()
+    result = graph.invoke({"messages": [{"role": "user", "content": "Find hotels and flights to Rome"}]})
+    return [message.name for message in result["messages"] if message.type == "ai" and message.content], result
+
+
+def test_mixed_handoffs_run_one_after_another():
+    # flight_agent cannot be fanned out, so both handoffs run in order instead of only the first
+    replies, result = _run(["hotel_agent"])
+    assert replies[:2] == ["hotel_agent", "flight_agent"]
+    assert result["next_agents"] == []
+
+
+def test_parallel_handoffs_are_merged():
+    replies, result = _run(["hotel_agent", "flight_agent"])
+    assert replies == ["supervisor"]
+    assert result["next_agents"] == []
@@ -0,0 +1,43 @@
+import asyncio
+
+import llm_scheduler
+from fake_llm import FakeToolCallingChatModel
+from llm_provider import _scheduled
+from llm_scheduler import LLMScheduler, TokenBucket
+
+PROMPT = [{"role": "user", "content": "Plan a 3-day budget trip to Rome"}]
+
+
+def _scheduler(monkeypatch):
+    scheduler = LLMScheduler(rpm=0)
+    # A large bucket that refills one token a second, so the charge left after one call is visible
+    scheduler.tokens = TokenBucket(60, capacity=100000)
+    monkeypatch.setattr(llm_scheduler, "_scheduler", scheduler)
+    return scheduler
+
+
+def _charged(scheduler):
+    return scheduler.tokens.capacity - scheduler.tokens.level
+
+
+def test_streamed_call_charges_reported_usage_not_the_estimate(monkeypatch):
+    scheduler = _scheduler(monkeypatch)
+    model = _scheduled(FakeToolCallingChatModel)()
+    chunks = list(model.stream(PROMPT))
+    usage = chunks[0].usage_metadata
+    assert len(chunks) > 1
+    assert scheduler.stats()["tokens_used"] == usage["total_tokens"]
+    assert abs(_charged(scheduler) - usage["total_tokens"]) < 5
+    assert scheduler.in_flight == 0
+
+
+def test_async_streamed_call_charges_reported_usage(monkeypatch):
+    scheduler = _scheduler(monkeypatch)
+    model = _scheduled(FakeToolCallingChatModel)()
+
+    async def stream():
+        return [chunk async for chunk in model.astream(PROMPT)]
+
+    usage = asyncio.run(stream())[0].usage_metadata
+    assert scheduler.stats()["tokens_used"] == usage["total_tokens"]
+    assert abs(_charged(scheduler) - usage["total_tokens"]) < 5
@@ -0,0 +1,18 @@
+from slot_extractor import extract_slots, planning_entry_router
+
+
+def _route(text):
+    return planning_entry_router({"messages": [{"role": "user", "content": text}]})
+
+
+def test_plan_request_goes_to_itinerary_agent():
+    assert _route("Plan a 3-day budget trip to Paris") == "itinerary_agent"
+
+
+def test_hotel_and_flight_requests_go_to_supervisor():
+    assert _route("Find hotels for my 3-day budget trip to Paris") is None
+    assert _route("Book flights to Rome for my 5-day luxury vacation") is None
+
+
+def test_nights_are_not_padded_to_days():
+    assert extract_slots("a 10-night budget trip to Lisbon")["days"] == 10
@@ -0,0 +1,248 @@
+"""
+Tracing - lightweight spans for graph nodes, tools, LLM calls and provider HTTP
+
+    with span("tool.search_hotels", city_code="PAR") as s:
+        s.set("cache.hit", True)
+
+Spans nest through a contextvar, so a turn wrapped in ``span("turn")`` collects
+every node, tool, LLM and HTTP span it causes, including those running in
+langgraph's worker threads and asyncio tasks. Finished traces are kept in memory
+(recent_trace() feeds the Streamlit waterfall) and exported according to
+TRACE_EXPORTER:
+
+    none  (default) in-memory only
+    json  one JSON line per span appended to TRACE_FILE
+    otlp  OTLP/HTTP JSON posted to OTEL_EXPORTER_OTLP_ENDPOINT (e.g. a local collector)
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "travel-light")
+MAX_TRACES = 200
+
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; attributes are plain JSON-serialisable values."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "error")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.end = None
+        self.attributes = dict(attributes or {})
+        self.error = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+        return self
+
+    def add(self, key, amount=1):
+        """Increment a numeric attribute, e.g. retries."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+        return self
+
+    @property
+    def duration_ms(self):
+        return None if self.end is None else (self.end - self.start) * 1000
+
+    def to_dict(self):
+        return {
+            "name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+            "parent_id": self.parent_id, "start": self.start, "end": self.end,
+            "duration_ms": self.duration_ms, "attributes": self.attributes, "error": self.error,
+        }
+
+
+class _NoSpan:
+    """Returned by current_span() outside any span, so callers can always call set()."""
+
+    def set(self, key, value):
+        return self
+
+    def add(self, key, amount=1):
+        return self
+
+
+NO_SPAN = _NoSpan()
+
+
+class _Store:
+    """Finished spans grouped by trace, for the most recent MAX_TRACES traces."""
+
+    def __init__(self):
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            spans = self._traces.setdefault(span.trace_id, [])
+            spans.append(span)
+            self._traces.move_to_end(span.trace_id)
+            while len(self._traces) > MAX_TRACES:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id):
+        with self._lock:
+            return list(self._traces.get(trace_id, []))
+
+
+_store = _Store()
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(spans):
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "travel_light"}, "spans": [{
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(int(s.start * 1e9)),
+            "endTimeUnixNano": str(int(s.end * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        } for s in spans]}],
+    }]}
+
+
+class _Exporter:
+    """Background thread that writes finished spans to a JSON file or an OTLP collector."""
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+
+    def submit(self, span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self):
+        spans = [self._queue.get()]
+        while len(spans) < 512:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return spans
+
+    def _run(self):
+        while True:
+            spans = self._drain()
+            try:
+                if self.kind == "json":
+                    with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                        f.writelines(json.dumps(s.to_dict()) + "\n" for s in spans)
+                else:
+                    request = urllib.request.Request(
+                        f"{OTLP_ENDPOINT}/v1/traces", data=json.dumps(_otlp_payload(spans)).encode(),
+                        headers={"Content-Type": "application/json"}, method="POST")
+                    urllib.request.urlopen(request, timeout=5).close()
+            except Exception:
+                # Tracing must never break a turn; lost batches are only counted
+                self.dropped += len(spans)
+
+
+_exporter = _Exporter(TRACE_EXPORTER) if TRACE_EXPORTER in ("json", "otlp") else None
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """Time the enclosed block as a child of the current span."""
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end = time.time()
+        _store.add(current)
+        if _exporter is not None:
+            _exporter.submit(current)
+
+
+def current_span():
+    """The innermost active span, or a no-op stand-in outside any span."""
+    return _current.get() or NO_SPAN
+
+
+def traced(name=None, **attributes):
+    """Decorator wrapping a sync or async function in a span."""
+    def decorate(func):
+        span_name = name or func.__name__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def recent_trace(trace_id):
+    """Finished spans of ``trace_id`` ordered by start time (list of dicts)."""
+    return [s.to_dict() for s in sorted(_store.get(trace_id), key=lambda s: s.start)]
+
+
+def waterfall(trace_id):
+    """Rows for a timing waterfall: name, depth, offset and duration in ms from the trace start."""
+    spans = recent_trace(trace_id)
+    if not spans:
+        return []
+    origin = min(s["start"] for s in spans)
+    depth = {}
+    rows = []
+    for s in spans:
+        depth[s["span_id"]] = depth.get(s["parent_id"], -1) + 1
+        rows.append({
+            "span": s["name"],
+            "depth": depth[s["span_id"]],
+            "offset_ms": round((s["start"] - origin) * 1000, 1),
+            "duration_ms": round(s["duration_ms"] or 0, 1),
+            "attributes": s["attributes"],
+            "error": s["error"],
+        })
+    return rows
@@ -1,8 +1,60 @@
 """
 Travel Graph Module - Imports the conversation graph from travel_light.py
+
+get_conversation_graph() is the process-wide entry point: the agents, supervisor
+and StateGraph are compiled once per checkpointer and reused by every caller.
 """
 
-from travel_light import build_conversation_graph
+import os
+import threading
+import time
+
+_import_started = time.perf_counter()
+from travel_light import build_conversation_graph  # noqa: E402
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+_graphs = {}
+_build_seconds = {}
+_lock = threading.Lock()
+
+
+def get_conversation_graph(checkpointer_kind=None):
+    """Return the compiled graph for ``checkpointer_kind``, building it on first use.
+
+    ``checkpointer_kind`` is a checkpointing backend name (sqlite, postgres,
+    memory, none); None uses GRAPH_CHECKPOINTER.
+    """
+    kind = (checkpointer_kind or os.getenv("GRAPH_CHECKPOINTER", "sqlite")).lower()
+    graph = _graphs.get(kind)
+    if graph is None:
+        with _lock:
+            graph = _graphs.get(kind)
+            if graph is None:
+                from checkpointing import get_checkpointer
+                started = time.perf_counter()
+                graph = build_conversation_graph(checkpointer=get_checkpointer(kind))
+                _build_seconds[kind] = time.perf_counter() - started
+                _graphs[kind] = graph
+    return graph
+
+
+def startup_stats():
+    """Cold-start timings: module import and per-checkpointer graph build, in seconds."""
+    return {"import_seconds": IMPORT_SECONDS, "build_seconds": dict(_build_seconds)}
+
 
 # Re-export the function for the webpage
-__all__ = ['build_conversation_graph']
+__all__ = ['build_conversation_graph', 'get_conversation_graph', 'startup_stats']
+
+if __name__ == "__main__":
+    # Measure cold vs. warm startup: python travel_graph.py
+    started = time.perf_counter()
+    get_conversation_graph("none")
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    get_conversation_graph("none")
+    warm = time.perf_counter() - started
+    stats = startup_stats()
+    print(f"⏱️  import: {stats['import_seconds'] * 1000:.1f} ms")
+    print(f"⏱️  cold build: {cold * 1000:.1f} ms")
+    print(f"⏱️  warm lookup: {warm * 1000:.3f} ms")
@@ -1,17 +1,20 @@
+import asyncio
 import os
-import requests
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Check for OpenAI API key early
-if not os.getenv("OPENAI_API_KEY"):
+from llm_provider import llm_configured
+
+# Check for OpenAI API key early (LLM_PROVIDER=fake runs the full graph offline)
+if not llm_configured():
     print("⚠️  Warning: OPENAI_API_KEY not found. Running in demo mode.")
     print("💡 To use the full AI version, set OPENAI_API_KEY in your .env file")
     
     # Demo mode - create simple functions that return demo data
-    def build_conversation_graph():
+    def build_conversation_graph(checkpointer=None):
         """Demo version of the conversation graph."""
         class DemoGraph:
             def invoke(self, state):
@@ -30,6 +33,9 @@ if not os.getenv("OPENAI_API_KEY"):
                             {"role": "assistant", "content": "🎯 I can help you plan trips! Try asking for a specific destination, like 'Plan a 3-day budget trip to Bali'"}
                         ]
                     }
+
+            async def ainvoke(self, state):
+                return self.invoke(state)
         
         return DemoGraph()
     
@@ -37,76 +43,248 @@ if not os.getenv("OPENAI_API_KEY"):
     __all__ = ['build_conversation_graph']
     
 else:
-    # Full AI mode - import the real components
-    from llm_provider import ACTIVE_LLM
-    from langgraph.prebuilt import create_react_agent
-    from langgraph_supervisor import create_supervisor
+    # Full AI mode - import the real components (langchain/langgraph load in build_agents)
+    from amadeus_auth import AMADEUS_BASE_URL, AmadeusTokenManager
+    from provider_client import (abody_text, aclose_response, aiter_body, body_text, get_provider_client,
+                                 iter_body)
+    from hotel_cache import hotel_cache_from_env, normalize_hotel_search
+    from hotel_search import (HotelRanking, arank_hotel_offers, asearch_legs, format_hotels, format_legs,
+                              normalize_hotel_legs, rank_hotel_offers, search_legs, stay_nights)
+    from iata_index import resolution_note, resolve_city_code
+    from itinerary_cache import CachedItineraryAgent, itinerary_cache_from_env
+    from slot_extractor import planning_entry_router
+    from conversation_compactor import compactor_from_env
+    from flight_search import FlightSearch, format_offers, normalize_flight_search
+    from metrics import instrumented, mark_failed
+    from tracing import current_span, traced
 
     AMADEUS_API_KEY = os.getenv("AMADEUS_API_KEY")
     AMADEUS_API_SECRET = os.getenv("AMADEUS_API_SECRET")
     AVIATIONSTACK_API_KEY = os.getenv("AVIATIONSTACK_API_KEY")
 
+    amadeus_token_manager = AmadeusTokenManager(AMADEUS_API_KEY, AMADEUS_API_SECRET)
+    hotel_cache = hotel_cache_from_env()
+
+    @instrumented("get_amadeus_access_token")
     def get_amadeus_access_token():
-        """Obtain Amadeus API OAuth2 Access Token."""
-        url = "https://test.api.amadeus.com/v1/security/oauth2/token"
-        payload = {
-            'grant_type': 'client_credentials',
-            'client_id': AMADEUS_API_KEY,
-            'client_secret': AMADEUS_API_SECRET
-        }
-        response = requests.post(url, data=payload)
-        if response.status_code == 200:
-            return response.json()["access_token"]
-        else:
-            raise Exception(f"Failed to retrieve Amadeus token: {response.text}")
+        """Obtain Amadeus API OAuth2 Access Token (cached until shortly before expiry)."""
+        return amadeus_token_manager.get_token()
+
+    @instrumented("get_amadeus_access_token")
+    async def aget_amadeus_access_token():
+        """Async version of get_amadeus_access_token; cache hits stay on the event loop."""
+        return await amadeus_token_manager.aget_token()
 
-    def search_hotels(city_code: str, check_in: str, check_out: str, adults: int = 1) -> str:
-        """Search hotels using Amadeus API based on city, dates, and number of adults."""
+    AVIATIONSTACK_BASE_URL = os.getenv("AVIATIONSTACK_BASE_URL", "http://api.aviationstack.com").rstrip("/")
+    AMADEUS_HOTEL_OFFERS_URL = f"{AMADEUS_BASE_URL}/v2/shopping/hotel-offers"
+    AVIATIONSTACK_FLIGHTS_URL = f"{AVIATIONSTACK_BASE_URL}/v1/flights"
+    AMADEUS_FLIGHT_OFFERS_URL = f"{AMADEUS_BASE_URL}/v2/shopping/flight-offers"
+
+    def _hotel_params(city_code, check_in, check_out, adults):
+        # USD so prices compare with the budget-tier bands in hotel_search
+        return {"cityCode": city_code, "checkInDate": check_in, "checkOutDate": check_out, "adults": adults,
+                "currency": "USD"}
+
+    def _hotel_ranking(search, budget, min_rating):
+        """(ranking, cache variant) for the traveller's budget tier and minimum star rating."""
+        ranking = HotelRanking(stay_nights(search[1], search[2]), budget, min_rating)
+        variant = f"{ranking.budget}|{ranking.min_rating}" if ranking.budget or ranking.min_rating else ""
+        return ranking, variant
+
+    @instrumented("search_hotels")
+    @traced("tool.search_hotels")
+    def search_hotels(city_code: str, check_in: str, check_out: str, adults: int = 1, budget: str = "",
+                      min_rating: int = 0) -> str:
+        """Search hotels using Amadeus API and rank every offer by price, rating and budget-tier fit."""
         if not AMADEUS_API_KEY or not AMADEUS_API_SECRET:
             return "Amadeus API credentials not configured. Please set AMADEUS_API_KEY and AMADEUS_API_SECRET in your .env file."
         
         try:
-            token = get_amadeus_access_token()
-            url = f"https://test.api.amadeus.com/v2/shopping/hotel-offers?cityCode={city_code}&checkInDate={check_in}&checkOutDate={check_out}&adults={adults}"
-            headers = {"Authorization": f"Bearer {token}"}
-            response = requests.get(url, headers=headers)
-            if response.status_code != 200:
-                return f"Failed to retrieve hotels: {response.text}"
-            hotels = response.json().get("data", [])
-            if not hotels:
-                return "No hotels found."
-            return "\n".join([
-                f"{h['hotel']['name']} - ${h['offers'][0]['price']['total']}"
-                for h in hotels[:3]
-            ])
+            # "Bali" or "Pariss" resolve to DPS/PAR locally, before any provider call
+            search = normalize_hotel_search(resolve_city_code(city_code), check_in, check_out, adults)
+            # Say so when the city was read loosely ("interpreted 'Pariss' as Paris, FR (PAR)")
+            note = resolution_note(city_code)
+            note = f"\nNote: {note}" if note else ""
+            ranking, variant = _hotel_ranking(search, budget, min_rating)
+            cached = hotel_cache.get(*search, variant=variant)
+            current_span().set("city_code", search[0]).set("cache.hit", cached is not None)
+            if cached is not None:
+                return cached + note
+
+            client = get_provider_client()
+            params = _hotel_params(*search)
+            headers = {"Authorization": f"Bearer {get_amadeus_access_token()}"}
+            # Streamed: every hotel is parsed and ranked one by one instead of loading the whole payload
+            response = client.get(AMADEUS_HOTEL_OFFERS_URL, params=params, headers=headers, stream=True)
+            if response.status_code == 401:
+                # Token was revoked or expired early - fetch a fresh one and retry once
+                response.close()
+                amadeus_token_manager.invalidate()
+                headers = {"Authorization": f"Bearer {get_amadeus_access_token()}"}
+                response = client.get(AMADEUS_HOTEL_OFFERS_URL, params=params, headers=headers, stream=True)
+            try:
+                if response.status_code != 200:
+                    mark_failed()
+                    return f"Failed to retrieve hotels: {body_text(response)}"
+                result = format_hotels(rank_hotel_offers(iter_body(response), ranking), search, ranking)
+            finally:
+                response.close()
+            hotel_cache.set(*search, result, variant=variant)
+            return result + note
         except Exception as e:
+            current_span().set("error", str(e))
+            mark_failed()
             return f"Error searching hotels: {str(e)}"
 
-    def hotel_search_tool(city_code: str, check_in: str, check_out: str, adults: int = 1) -> str:
-        """Retrieve hotel options for specified city and dates using Amadeus API."""
-        return search_hotels(city_code, check_in, check_out, adults)
+    @instrumented("search_hotels")
+    @traced("tool.search_hotels")
+    async def asearch_hotels(city_code: str, check_in: str, check_out: str, adults: int = 1, budget: str = "",
+                             min_rating: int = 0) -> str:
+        """Async version of search_hotels for the event-loop execution path."""
+        if not AMADEUS_API_KEY or not AMADEUS_API_SECRET:
+            return "Amadeus API credentials not configured. Please set AMADEUS_API_KEY and AMADEUS_API_SECRET in your .env file."
 
-    def flight_search_tool(query: str) -> str:
-        """Search for flights using AviationStack API (static example)."""
-        if not AVIATIONSTACK_API_KEY:
-            return "AviationStack API key not configured. Please set AVIATIONSTACK_API_KEY in your .env file."
-        
         try:
-            source = "JFK"
-            destination = "LHR"
-            date = "2025-06-01"
-            url = f"http://api.aviationstack.com/v1/flights?access_key={AVIATIONSTACK_API_KEY}&dep_iata={source}&arr_iata={destination}&flight_date={date}"
-            response = requests.get(url)
-            if response.status_code != 200:
-                return f"Failed to fetch flight data: {response.text}"
-            flights = response.json().get('data', [])
-            if not flights:
-                return "No flights found."
-            return "\n".join([
-                f"{f['airline']['name']} flight {f['flight']['iata']} at {f['departure']['scheduled']}"
-                for f in flights[:3]
-            ])
+            # "Bali" or "Pariss" resolve to DPS/PAR locally, before any provider call
+            search = normalize_hotel_search(resolve_city_code(city_code), check_in, check_out, adults)
+            # Say so when the city was read loosely ("interpreted 'Pariss' as Paris, FR (PAR)")
+            note = resolution_note(city_code)
+            note = f"\nNote: {note}" if note else ""
+            ranking, variant = _hotel_ranking(search, budget, min_rating)
+            cached = hotel_cache.get(*search, variant=variant)
+            current_span().set("city_code", search[0]).set("cache.hit", cached is not None)
+            if cached is not None:
+                return cached + note
+
+            client = get_provider_client()
+            params = _hotel_params(*search)
+            headers = {"Authorization": f"Bearer {await aget_amadeus_access_token()}"}
+            response = await client.aget(AMADEUS_HOTEL_OFFERS_URL, params=params, headers=headers, stream=True)
+            if response.status_code == 401:
+                await aclose_response(response)
+                amadeus_token_manager.invalidate()
+                headers = {"Authorization": f"Bearer {await aget_amadeus_access_token()}"}
+                response = await client.aget(AMADEUS_HOTEL_OFFERS_URL, params=params, headers=headers, stream=True)
+            try:
+                if response.status_code != 200:
+                    mark_failed()
+                    return f"Failed to retrieve hotels: {await abody_text(response)}"
+                result = format_hotels(await arank_hotel_offers(aiter_body(response), ranking), search, ranking)
+            finally:
+                await aclose_response(response)
+            hotel_cache.set(*search, result, variant=variant)
+            return result + note
         except Exception as e:
+            current_span().set("error", str(e))
+            mark_failed()
+            return f"Error searching hotels: {str(e)}"
+
+    def hotel_search_tool(city_code: str, check_in: str, check_out: str, adults: int = 1, budget: str = "",
+                          min_rating: int = 0) -> str:
+        """Retrieve the best hotels for a city (name or IATA city code) and dates using Amadeus API.
+
+        budget is the trip's tier (budget, mid-range or luxury); min_rating is the lowest acceptable star rating.
+        """
+        return search_hotels(city_code, check_in, check_out, adults, budget, min_rating)
+
+    async def ahotel_search_tool(city_code: str, check_in: str, check_out: str, adults: int = 1, budget: str = "",
+                                 min_rating: int = 0) -> str:
+        """Retrieve the best hotels for a city (name or IATA city code) and dates using Amadeus API.
+
+        budget is the trip's tier (budget, mid-range or luxury); min_rating is the lowest acceptable star rating.
+        """
+        return await asearch_hotels(city_code, check_in, check_out, adults, budget, min_rating)
+
+    @instrumented("multi_city_hotel_search_tool")
+    @traced("tool.multi_city_hotel_search")
+    def multi_city_hotel_search_tool(legs: list[dict], budget: str = "", min_rating: int = 0) -> str:
+        """Retrieve the best hotels for several stays at once, e.g. every city of a multi-city trip.
+
+        legs is a list of {"city": ..., "check_in": "YYYY-MM-DD", "check_out": "YYYY-MM-DD", "adults": 1};
+        budget and min_rating apply to every leg. Returns one ranked table per leg.
+        """
+        try:
+            legs = normalize_hotel_legs(legs)
+        except ValueError as e:
+            mark_failed()
+            return f"Error searching hotels: {e}"
+        current_span().set("legs", len(legs))
+        results = search_legs(legs, lambda *leg: search_hotels(*leg, budget, min_rating))
+        return format_legs(legs, results)
+
+    @instrumented("multi_city_hotel_search_tool")
+    @traced("tool.multi_city_hotel_search")
+    async def amulti_city_hotel_search_tool(legs: list[dict], budget: str = "", min_rating: int = 0) -> str:
+        """Retrieve the best hotels for several stays at once, e.g. every city of a multi-city trip.
+
+        legs is a list of {"city": ..., "check_in": "YYYY-MM-DD", "check_out": "YYYY-MM-DD", "adults": 1};
+        budget and min_rating apply to every leg. Returns one ranked table per leg.
+        """
+        try:
+            legs = normalize_hotel_legs(legs)
+        except ValueError as e:
+            mark_failed()
+            return f"Error searching hotels: {e}"
+        current_span().set("legs", len(legs))
+        results = await asearch_legs(legs, lambda *leg: asearch_hotels(*leg, budget, min_rating))
+        return format_legs(legs, results)
+
+    # Amadeus flight offers first (fares, cabins), AviationStack schedules as the fallback
+    flight_search = FlightSearch(
+        amadeus_url=AMADEUS_FLIGHT_OFFERS_URL if AMADEUS_API_KEY and AMADEUS_API_SECRET else None,
+        amadeus_token=get_amadeus_access_token,
+        aamadeus_token=aget_amadeus_access_token,
+        invalidate_token=amadeus_token_manager.invalidate,
+        aviationstack_url=AVIATIONSTACK_FLIGHTS_URL,
+        aviationstack_key=AVIATIONSTACK_API_KEY,
+    )
+
+    @instrumented("flight_search_tool")
+    @traced("tool.flight_search")
+    def flight_search_tool(origin: str, destination: str, departure_date: str, departure_date_end: str = "",
+                           return_date: str = "", cabin: str = "ECONOMY", adults: int = 1,
+                           nonstop: bool = False) -> str:
+        """Search flights between two cities or airports (names or IATA codes) and return the best offers, cheapest first.
+
+        Searches every departure date from departure_date to departure_date_end (inclusive, optional).
+        cabin is ECONOMY, PREMIUM_ECONOMY, BUSINESS or FIRST; return_date makes it a round trip.
+        """
+        if not flight_search.configured:
+            return "No flight provider configured. Please set AMADEUS_API_KEY/AMADEUS_API_SECRET or AVIATIONSTACK_API_KEY in your .env file."
+
+        try:
+            query = normalize_flight_search(origin, destination, departure_date, departure_date_end,
+                                            return_date, cabin, adults, nonstop)
+            current_span().set("route", f"{query['origin']}-{query['destination']}").set("dates", len(query["dates"]))
+            offers, total, sources = flight_search.search(query)
+            return format_offers(offers, query, total, sources)
+        except Exception as e:
+            current_span().set("error", str(e))
+            mark_failed()
+            return f"Error searching flights: {str(e)}"
+
+    @instrumented("flight_search_tool")
+    @traced("tool.flight_search")
+    async def aflight_search_tool(origin: str, destination: str, departure_date: str, departure_date_end: str = "",
+                                  return_date: str = "", cabin: str = "ECONOMY", adults: int = 1,
+                                  nonstop: bool = False) -> str:
+        """Search flights between two cities or airports (names or IATA codes) and return the best offers, cheapest first.
+
+        Searches every departure date from departure_date to departure_date_end (inclusive, optional).
+        cabin is ECONOMY, PREMIUM_ECONOMY, BUSINESS or FIRST; return_date makes it a round trip.
+        """
+        if not flight_search.configured:
+            return "No flight provider configured. Please set AMADEUS_API_KEY/AMADEUS_API_SECRET or AVIATIONSTACK_API_KEY in your .env file."
+
+        try:
+            query = normalize_flight_search(origin, destination, departure_date, departure_date_end,
+                                            return_date, cabin, adults, nonstop)
+            current_span().set("route", f"{query['origin']}-{query['destination']}").set("dates", len(query["dates"]))
+            offers, total, sources = await flight_search.asearch(query)
+            return format_offers(offers, query, total, sources)
+        except Exception as e:
+            current_span().set("error", str(e))
+            mark_failed()
             return f"Error searching flights: {str(e)}"
 
     # Itinerary Agent Prompt
@@ -129,28 +307,8 @@ else:
         """
     )
 
-    # Fully LLM-Driven Itinerary Agent
-    itinerary_agent = create_react_agent(
-        model=ACTIVE_LLM,
-        tools=[],
-        prompt=itinerary_agent_prompt,
-        name="itinerary_agent"
-    )
-
-    # Flight and Hotel Agents
-    flight_agent = create_react_agent(
-        model=ACTIVE_LLM,
-        tools=[flight_search_tool],
-        prompt="You are a flight booking assistant. Help users find flights based on destination and travel dates.",
-        name="flight_agent"
-    )
-
-    hotel_agent = create_react_agent(
-        model=ACTIVE_LLM,
-        tools=[hotel_search_tool],
-        prompt="You are a hotel booking assistant. Find hotels based on city, check-in, and check-out dates.",
-        name="hotel_agent"
-    )
+    # Repeat requests ("3-day budget Bali") are answered from the cache
+    itinerary_cache = itinerary_cache_from_env()
 
     # ✅ Updated Supervisor Prompt to Ensure Itinerary is Shown
     supervisor_prompt = (
@@ -164,7 +322,7 @@ else:
             - Budget (budget, mid-range, luxury)
 
         ✈️ Once collected:
-        - HANDOFF to `itinerary_agent`.
+        - HANDOFF to `itinerary_agent` by calling the `transfer_to_itinerary_agent` tool.
         - WAIT for the agent to return a **full, visible itinerary**.
 
         📋 After presenting the itinerary:
@@ -180,28 +338,93 @@ else:
             - Flight class
 
         🎯 Then:
-        - HANDOFF to `hotel_agent` or `flight_agent` based on user request.
+        - HANDOFF to `hotel_agent` or `flight_agent` based on user request, using `transfer_to_hotel_agent` or `transfer_to_flight_agent`.
+        - If the user wants both, call both transfer tools in the same turn so the agents run together.
         - Respond only with the agent's message without extra commentary.
         """
     )
 
-    def build_conversation_graph():
-        """Build the multi-agent graph with itinerary, flight, and hotel agents."""
+    def build_itinerary_agent():
+        """Create the itinerary agent, fronted by the shared itinerary cache."""
+        from langgraph.prebuilt import create_react_agent
+        from llm_provider import get_llm
+
+        # Fully LLM-Driven Itinerary Agent
+        itinerary_agent = create_react_agent(
+            model=get_llm("itinerary_agent"),
+            tools=[],
+            prompt=itinerary_agent_prompt,
+            name="itinerary_agent"
+        )
+        return CachedItineraryAgent(itinerary_agent, itinerary_cache)
+
+    def build_agents():
+        """Create the itinerary, flight and hotel agents."""
+        # langchain/langgraph are imported here rather than at module load to keep startup cheap
+        from langchain_core.tools import StructuredTool
+        from langgraph.prebuilt import create_react_agent
+        from llm_provider import get_llm
+
+        # Tools expose both entry points: agents use the coroutine under ainvoke/astream
+        hotel_tool = StructuredTool.from_function(func=hotel_search_tool, coroutine=ahotel_search_tool)
+        multi_city_hotel_tool = StructuredTool.from_function(func=multi_city_hotel_search_tool,
+                                                             coroutine=amulti_city_hotel_search_tool)
+        flight_tool = StructuredTool.from_function(func=flight_search_tool, coroutine=aflight_search_tool)
+
+        # Flight and Hotel Agents
+        flight_agent = create_react_agent(
+            model=get_llm("flight_agent"),
+            tools=[flight_tool],
+            prompt=("You are a flight booking assistant. Search flights with the origin and destination IATA codes, "
+                    "the departure date (or a range of dates when the user is flexible), cabin class and number "
+                    "of travelers, then present the ranked options."),
+            name="flight_agent"
+        )
+
+        hotel_agent = create_react_agent(
+            model=get_llm("hotel_agent"),
+            tools=[hotel_tool, multi_city_hotel_tool],
+            prompt=("You are a hotel booking assistant. Find hotels based on city, check-in, and check-out dates, "
+                    "passing the trip's budget tier and the traveler's preferred hotel rating, then present the "
+                    "ranked options. When the trip has several cities or stays, search them all in one "
+                    "multi_city_hotel_search_tool call instead of one hotel_search_tool call per city."),
+            name="hotel_agent"
+        )
+
+        return [build_itinerary_agent(), flight_agent, hotel_agent]
+
+    def build_conversation_graph(checkpointer=None):
+        """Build the multi-agent graph with itinerary, flight, and hotel agents.
+
+        With a checkpointer (see checkpointing.get_checkpointer) the graph keeps each
+        thread's history itself, so callers send only the new message per turn.
+        Prefer travel_graph.get_conversation_graph(), which builds it once per process.
+        """
+        from langgraph_supervisor import create_supervisor
+        from llm_provider import get_llm
+
         supervisor = create_supervisor(
-            model=ACTIVE_LLM,
-            agents=[itinerary_agent, flight_agent, hotel_agent],
+            model=get_llm("supervisor_route"),
+            agents=build_agents(),
             prompt=supervisor_prompt,
             add_handoff_back_messages=True,
-            output_mode="full_history",
+            # Agents' tool calls stay out of the shared history; only their replies are kept
+            output_mode="last_message",
+            parallel_agents=["hotel_agent", "flight_agent"],
+            # "Plan a 3-day budget trip to Bali" goes straight to itinerary_agent
+            entry_router=planning_entry_router,
+            history_compactor=compactor_from_env(),
+            # Routing runs on the fast tier; relaying an agent's reply can use its own tier
+            phase_models={"respond": get_llm("supervisor_respond")},
         )
-        return supervisor.compile()
+        return supervisor.compile(checkpointer=checkpointer)
 
     # Export the function
     __all__ = ['build_conversation_graph']
 
 if __name__ == "__main__":
     # Check if OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
+    if not llm_configured():
         print("❌ Error: OPENAI_API_KEY not found in environment variables.")
         print("Please create a .env file with your OpenAI API key:")
         print("OPENAI_API_KEY=your_api_key_here")
@@ -222,18 +445,47 @@ if __name__ == "__main__":
         
         exit(0)
     
+    from conversation_stream import astream_conversation, stream_conversation
+
     print("🚀 Starting Travel Light - AI Travel Planning Assistant")
     print("=" * 50)
     
     graph = build_conversation_graph()
     test_state = {"messages": [{"role": "user", "content": "Plan a 3-day solo budget trip to Bali"}]}
     
+    def print_event(event):
+        if event["type"] == "agent":
+            print(f"\n🔀 [{event['node']}]", flush=True)
+        elif event["type"] == "token":
+            print(event["content"], end="", flush=True)
+
+    async def astream_turn(state):
+        result = {}
+        async for event in astream_conversation(graph, state):
+            print_event(event)
+            if event["type"] == "final":
+                result = event["state"]
+        return result
+
     try:
-        result = graph.invoke(test_state)
-        print("\n📋 Conversation History:")
+        print("\n📡 Streaming Response:")
+        print("=" * 50)
+        if "--async" in sys.argv:
+            # Same turn through the asyncio path (graph.astream -> async tools)
+            result = asyncio.run(astream_turn(test_state))
+        else:
+            result = {}
+            for event in stream_conversation(graph, test_state):
+                print_event(event)
+                if event["type"] == "final":
+                    result = event["state"]
+        print("\n\n📋 Conversation History:")
         print("=" * 50)
         for msg in result.get("messages", []):
-            print(f"{msg['role'].capitalize()}: {msg['content']}")
+            if isinstance(msg, dict):
+                print(f"{msg['role'].capitalize()}: {msg['content']}")
+            else:
+                print(f"{msg.type.capitalize()}: {msg.content}")
     except Exception as e:
         print(f"❌ Error running the application: {str(e)}")
         print("\n💡 Make sure you have:")
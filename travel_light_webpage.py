@@ -1,7 +1,7 @@
 import streamlit as st
 from fpdf import FPDF
 from datetime import datetime
-import os
+import uuid
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -12,8 +12,10 @@ load_dotenv()
 st.set_page_config(page_title="Travel Light - AI Travel Planner", page_icon="✈️")
 st.title("✈️ Travel Light - AI Travel Planning Assistant")
 
-# Check for OpenAI API Key
-if not os.getenv("OPENAI_API_KEY"):
+from llm_provider import llm_configured
+
+# Check for OpenAI API Key (LLM_PROVIDER=fake runs offline)
+if not llm_configured():
     st.error("❌ OpenAI API Key not found!")
     st.markdown("""
     **To use the full AI-powered version:**
@@ -36,8 +38,20 @@ if not os.getenv("OPENAI_API_KEY"):
 
 # Try to import the travel graph
 try:
-    from travel_graph import build_conversation_graph
-    graph = build_conversation_graph()
+    from travel_graph import get_conversation_graph
+    from conversation_stream import stream_conversation, transcript
+    from checkpointing import session_checkpointer_kind, thread_config
+    from metrics import track_turn
+    from tracing import span, waterfall
+
+    # Built once per server process; Streamlit reruns reuse the compiled graph.
+    # The graph keeps each thread's (compacted) history in the checkpointer,
+    # so GRAPH_CHECKPOINTER=none falls back to in-memory checkpoints here.
+    @st.cache_resource(show_spinner="🔧 Loading travel agents...")
+    def load_graph():
+        return get_conversation_graph(session_checkpointer_kind())
+
+    graph = load_graph()
     ai_mode = True
 except ImportError as e:
     st.error(f"❌ Could not import travel planning system: {e}")
@@ -48,11 +62,18 @@ except Exception as e:
     st.info("💡 Check your API key and internet connection")
     st.stop()
 
+def _display_messages(state_values):
+    """Chat transcript (user and final assistant replies) from a checkpointed graph state."""
+    return transcript(state_values.get("messages", []))
+
 # Initialize Session State
+# The thread id lives in the URL so a conversation survives reruns and server restarts
+if "thread_id" not in st.session_state:
+    st.session_state["thread_id"] = st.query_params.get("thread") or uuid.uuid4().hex
+    st.query_params["thread"] = st.session_state["thread_id"]
+graph_config = thread_config(st.session_state["thread_id"])
 if "messages" not in st.session_state:
-    st.session_state["messages"] = []
-if "graph_state" not in st.session_state:
-    st.session_state["graph_state"] = {"messages": []}
+    st.session_state["messages"] = _display_messages(graph.get_state(graph_config).values)
 if "summary" not in st.session_state:
     st.session_state["summary"] = ""
 
@@ -106,8 +127,9 @@ with col3:
 # Handle Reset
 if reset_button:
     st.session_state["messages"] = []
-    st.session_state["graph_state"] = {"messages": []}
     st.session_state["summary"] = ""
+    st.session_state["thread_id"] = uuid.uuid4().hex
+    st.query_params["thread"] = st.session_state["thread_id"]
     st.rerun()
 
 # Handle User Input
@@ -115,56 +137,101 @@ if user_input and user_input.strip():
     # Append user message
     user_msg = {"role": "user", "content": user_input.strip()}
     st.session_state["messages"].append(user_msg)
-    st.session_state["graph_state"]["messages"].append(user_msg)
 
     # Show user message
     with st.chat_message("user"):
         st.markdown(user_input)
 
-    # Show AI is thinking
+    # Stream the AI response as it is generated
     with st.chat_message("assistant"):
-        with st.spinner("🤖 AI is planning your trip..."):
-            try:
-                # Invoke the graph
-                result = graph.invoke(st.session_state["graph_state"])
-                bot_messages = result.get("messages", [])
-
-                # Process and display bot response
-                if bot_messages:
-                    # Get the latest message content
-                    latest_bot_msg = bot_messages[-1]
-                    if hasattr(latest_bot_msg, 'content'):
-                        bot_content = latest_bot_msg.content
-                    else:
-                        bot_content = str(latest_bot_msg)
-                    
-                    bot_msg = {"role": "assistant", "content": bot_content}
-                    st.session_state["messages"].append(bot_msg)
-                    st.session_state["graph_state"]["messages"].append(bot_msg)
-                    
-                    # Display the response
-                    st.markdown(bot_content)
-                    
-                    # Create summary
-                    st.session_state["summary"] = "\n".join(
-                        getattr(m, 'content', str(m)) for m in bot_messages 
-                        if getattr(m, 'role', 'assistant') == 'assistant'
-                    )
+        status = st.empty()
+        body = st.empty()
+        status.caption("🤖 AI is planning your trip...")
+        try:
+            # Stream the graph: agent handoffs update the status line, tokens render live
+            result = {}
+            # One draft section per agent: fanned-out agents stream at the same time
+            drafts = {}
+            # Only the new message is sent; the checkpointer holds the rest of the thread
+            with span("turn", thread_id=st.session_state["thread_id"]) as turn_span, track_turn("web"):
+                st.session_state["last_trace_id"] = turn_span.trace_id
+                for event in stream_conversation(graph, {"messages": [user_msg]}, graph_config):
+                    if event["type"] == "agent":
+                        status.caption(f"🔀 {event['node']} is working...")
+                    elif event["type"] == "token":
+                        drafts[event["node"]] = drafts.get(event["node"], "") + event["content"]
+                        body.markdown("\n\n".join(drafts.values()) + "▌")
+                    elif event["type"] == "final":
+                        result = event["state"]
+            status.empty()
+            bot_messages = result.get("messages", [])
+
+            # Process and display bot response
+            if bot_messages:
+                # Get the latest message content
+                latest_bot_msg = bot_messages[-1]
+                if hasattr(latest_bot_msg, 'content'):
+                    bot_content = latest_bot_msg.content
                 else:
-                    error_msg = "The AI didn't return a response. Please try again."
-                    st.error(error_msg)
-                    st.session_state["messages"].append({"role": "assistant", "content": error_msg})
-                    
-            except Exception as e:
-                error_msg = f"❌ Error: {str(e)}"
+                    bot_content = str(latest_bot_msg)
+                
+                bot_msg = {"role": "assistant", "content": bot_content}
+                st.session_state["messages"].append(bot_msg)
+                
+                # Replace the streamed draft with the final response
+                body.markdown(bot_content)
+                
+                # Create summary
+                st.session_state["summary"] = "\n".join(
+                    getattr(m, 'content', str(m)) for m in bot_messages 
+                    if getattr(m, 'role', 'assistant') == 'assistant'
+                )
+            else:
+                error_msg = "The AI didn't return a response. Please try again."
                 st.error(error_msg)
                 st.session_state["messages"].append({"role": "assistant", "content": error_msg})
+                
+        except Exception as e:
+            error_msg = f"❌ Error: {str(e)}"
+            st.error(error_msg)
+            st.session_state["messages"].append({"role": "assistant", "content": error_msg})
 
     # Debug Output
     if debug_mode:
         st.markdown("---")
         st.markdown("### 🐛 Debug Information")
-        st.json(st.session_state["graph_state"])
+        state_values = graph.get_state(graph_config).values
+        st.json({
+            "thread_id": st.session_state["thread_id"],
+            "summary": state_values.get("summary", ""),
+            "slots": state_values.get("slots", {}),
+            "messages": [{"type": m.type, "content": m.content} for m in state_values.get("messages", [])],
+        })
+
+        # Per-turn timing waterfall: graph nodes, LLM calls, tools and provider HTTP
+        rows = waterfall(st.session_state.get("last_trace_id"))
+        if rows:
+            import altair as alt
+            import pandas as pd
+
+            st.markdown("#### ⏱️ Turn Timing")
+            timeline = pd.DataFrame([{
+                "span": f"{i:02d} {'· ' * row['depth']}{row['span']}",
+                "start_ms": row["offset_ms"],
+                "end_ms": row["offset_ms"] + row["duration_ms"],
+                "duration_ms": row["duration_ms"],
+                "details": ", ".join(f"{k}={v}" for k, v in row["attributes"].items()),
+            } for i, row in enumerate(rows)])
+            st.altair_chart(
+                alt.Chart(timeline).mark_bar().encode(
+                    x=alt.X("start_ms:Q", title="ms since turn start"),
+                    x2="end_ms:Q",
+                    y=alt.Y("span:N", sort=None, title=None),
+                    color=alt.Color("span:N", legend=None),
+                    tooltip=["span", "duration_ms", "details"],
+                ),
+                use_container_width=True,
+            )
         st.markdown("---")
 
 # Summary Section